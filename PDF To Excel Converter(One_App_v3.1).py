@@ -1,21 +1,140 @@
-import pdfplumber
-import pandas as pd
 import os
 import re
 import json
-import requests
-from bs4 import BeautifulSoup
+import sys
+import argparse
+import hashlib
+import errno
+import uuid
+import atexit
+import math
+import bisect
 from datetime import datetime as dt
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, Menu, scrolledtext
 import shutil
+import sqlite3
+import threading
+import queue
+import time
+from collections import OrderedDict, namedtuple
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from html.parser import HTMLParser
 from datetime import datetime
-from tkcalendar import Calendar
 
 # ==================== COMMON FUNCTIONS ====================
-def log_message(message, log_file="logfile.txt"):
-    with open(log_file, 'a') as file:
-        file.write(f"{dt.now()} - {message}\n")
+# pdfplumber, pandas, requests and tkcalendar take seconds to import, so they are imported where they
+# are first needed rather than here. Python caches the modules, so later imports are only a lookup.
+def lock_file(file):
+    # Blocks until this process holds an exclusive lock on the (open) file
+    if os.name == 'nt':
+        import msvcrt
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+    else:
+        import fcntl
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+
+def unlock_file(file):
+    if os.name == 'nt':
+        import msvcrt
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        import fcntl
+        fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+
+class RunLogger:
+    # Structured run log: one JSON object per line with the time, run id, process id, event name and
+    # the event's fields. Events are queued and appended in batches by a background thread. Each batch
+    # is written under a lock on a side file, so several processes can share (and rotate) one log.
+    # It has its own file: logfile.txt keeps the free-text lines of the older versions.
+    def __init__(self, log_file="run_log.jsonl", max_bytes=5 * 1024 * 1024, backups=3):
+        self.log_file = log_file
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.queue = queue.Queue()
+        self.thread = None
+        self.thread_lock = threading.Lock()
+
+    def start_run(self, **fields):
+        run_id = uuid.uuid4().hex[:12]
+        self.event(run_id, "run_start", **fields)
+        return run_id
+
+    def event(self, run_id, event, **fields):
+        record = {'time': dt.now().isoformat(timespec='milliseconds'), 'run': run_id, 'pid': os.getpid(), 'event': event}
+        record.update(fields)
+        self.queue.put(json.dumps(record, default=str))
+        metrics.record_event(event, fields)
+        with self.thread_lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.write_batches, daemon=True)
+                self.thread.start()
+
+    def flush(self, timeout=5):
+        # Waits until every event logged so far is on disk, or gives up after timeout seconds
+        deadline = time.monotonic() + timeout
+        with self.queue.all_tasks_done:
+            while self.queue.unfinished_tasks:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self.thread is None or not self.thread.is_alive():
+                    return False
+                self.queue.all_tasks_done.wait(remaining)
+        return True
+
+    def write_batches(self):
+        while True:
+            lines = [self.queue.get()]
+            while True:
+                try:
+                    lines.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self.append(lines)
+            except Exception as e:
+                # A failed batch is dropped; the thread stays alive so later events and flush() still work
+                print(f"Could not write {self.log_file}: {e}", file=sys.stderr)
+            finally:
+                for _ in lines:
+                    self.queue.task_done()
+
+    def append(self, lines):
+        with open(self.log_file + ".lock", 'a') as lock:
+            lock_file(lock)
+            try:
+                if os.path.exists(self.log_file) and os.path.getsize(self.log_file) >= self.max_bytes:
+                    self.rotate()
+                with open(self.log_file, 'a', encoding='utf-8') as file:
+                    file.write("\n".join(lines) + "\n")
+            finally:
+                unlock_file(lock)
+
+    def rotate(self):
+        # run_log.jsonl becomes run_log.jsonl.1, .1 becomes .2 and so on; the oldest backup is dropped
+        for index in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{self.log_file}.{index}"):
+                os.replace(f"{self.log_file}.{index}", f"{self.log_file}.{index + 1}")
+        os.replace(self.log_file, f"{self.log_file}.1")
+
+run_logger = RunLogger()
+atexit.register(run_logger.flush)
+
+def extract_text_from_pdf(pdf_path, timer=None):
+    import pdfplumber
+    timer = timer or StageTimer()
+    extracted_text = []
+    with timer.measure("open"):
+        pdf = pdfplumber.open(pdf_path)
+    with pdf:
+        for page in pdf.pages:
+            with timer.measure("extract"):
+                text = page.extract_text()
+            if text:
+                extracted_text.append(text)
+    return " ".join(extracted_text)
 
 def browse_folder(entry):
     folder_selected = filedialog.askdirectory()
@@ -25,6 +144,8 @@ def browse_folder(entry):
 def setup_context_menu(results_tree):
     context_menu = Menu(root, tearoff=0)
     context_menu.add_command(label="Copy Regex", command=lambda: copy_to_clipboard(results_tree))
+    context_menu.add_command(label="Save to Regex DB", command=lambda: save_to_regex_db(results_tree))
+    context_menu.add_command(label="Delete from Regex DB", command=lambda: delete_from_regex_db(results_tree))
     
     def show_context_menu(event):
         item = results_tree.identify_row(event.y)
@@ -50,11 +171,931 @@ def copy_to_clipboard(results_tree):
     root.update()
     messagebox.showinfo("Copied", "Regex expression copied to clipboard.")
 
+def save_to_regex_db(results_tree):
+    selected_item = results_tree.selection()
+    if not selected_item:
+        messagebox.showwarning("No Selection", "Please select a row to save.")
+        return
+
+    title, expression, description, matches, non_matches = (list(results_tree.item(selected_item[0], "values")) + [""] * 5)[:5]
+    try:
+        regex_database.add(expression, title=title, description=description, matches=matches,
+                           non_matches=non_matches, source="regexlib")
+        messagebox.showinfo("Saved", "Regex expression saved to the regex database.")
+    except Exception as e:
+        messagebox.showerror("Error", f"Failed to save regex: {e}")
+
+def delete_from_regex_db(results_tree):
+    selected_item = results_tree.selection()
+    if not selected_item or not selected_item[0].startswith("db-"):
+        messagebox.showwarning("No Selection", "Please select a row loaded from the regex database.")
+        return
+
+    try:
+        regex_database.delete(int(selected_item[0][3:]))
+        results_tree.delete(selected_item[0])
+    except Exception as e:
+        messagebox.showerror("Error", f"Failed to delete regex: {e}")
+
+class PagedTreeview:
+    # Rows are inserted a page at a time as the user scrolls towards the end of the list
+    def __init__(self, tree, scrollbar, page_size=200):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.page_size = page_size
+        self.rows = []
+        self.loaded = 0
+        self.tree.configure(yscrollcommand=self.on_scroll)
+
+    def clear(self):
+        self.rows = []
+        self.loaded = 0
+        children = self.tree.get_children()
+        if children:
+            self.tree.delete(*children)
+
+    def set_rows(self, rows):
+        # rows are (iid, values) pairs; iid None lets the tree pick one
+        self.clear()
+        self.rows = rows
+        self.load_next_page()
+
+    def load_next_page(self):
+        for iid, values in self.rows[self.loaded:self.loaded + self.page_size]:
+            if iid is None:
+                self.tree.insert("", "end", values=values)
+            else:
+                self.tree.insert("", "end", iid=iid, values=values)
+        self.loaded = min(self.loaded + self.page_size, len(self.rows))
+
+    def on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        if float(last) > 0.9 and self.loaded < len(self.rows):
+            self.load_next_page()
+
+class LazyNotebook:
+    # Each tab's widgets are built by its builder the first time the tab is selected
+    def __init__(self, notebook):
+        self.notebook = notebook
+        self.builders = {}
+        self.notebook.bind("<<NotebookTabChanged>>", self.build_selected, add="+")
+
+    def add(self, frame, text, builder):
+        self.builders[str(frame)] = builder
+        self.notebook.add(frame, text=text)
+
+    def build_selected(self, event=None):
+        builder = self.builders.pop(self.notebook.select(), None)
+        if builder is not None:
+            builder()
+
+class LogSink:
+    # Log lines are buffered and flushed to the Text widget every interval ms, keeping only the newest
+    # max_lines. With log_file set, every line also goes to that file from a background writer thread.
+    # write() may be called from any thread; flush() and clear() only from the Tk thread.
+    def __init__(self, text, max_lines=5000, interval=100, log_file=None):
+        self.text = text
+        self.max_lines = max_lines
+        self.interval = interval
+        self.pending = []
+        self.lock = threading.Lock()
+        self.file_queue = None
+        if log_file:
+            self.file_queue = queue.Queue()
+            threading.Thread(target=self.write_file, args=(log_file,), daemon=True).start()
+        self.text.after(self.interval, self.poll)
+
+    def write(self, message):
+        with self.lock:
+            self.pending.append(message)
+        if self.file_queue is not None:
+            self.file_queue.put(message)
+
+    def poll(self):
+        self.flush()
+        self.text.after(self.interval, self.poll)
+
+    def flush(self):
+        with self.lock:
+            lines, self.pending = self.pending, []
+        if not lines:
+            return
+        self.text.insert(tk.END, "\n".join(lines) + "\n")
+        line_count = int(self.text.index("end-1c").split(".")[0])
+        if line_count > self.max_lines:
+            self.text.delete("1.0", f"{line_count - self.max_lines}.0")
+        self.text.see(tk.END)
+
+    def clear(self):
+        with self.lock:
+            self.pending = []
+        self.text.delete("1.0", tk.END)
+
+    def write_file(self, log_file):
+        with open(log_file, 'a', encoding='utf-8') as file:
+            while True:
+                file.write(self.file_queue.get() + "\n")
+                # Everything queued so far is written before the file is flushed
+                while not self.file_queue.empty():
+                    file.write(self.file_queue.get_nowait() + "\n")
+                file.flush()
+
+def when_done(widget, future, callback, interval=50):
+    # Tk widgets are not thread-safe, so worker results are picked up from the Tk event loop
+    if not future.done():
+        widget.after(interval, when_done, widget, future, callback, interval)
+        return
+    callback(future)
+
+# ==================== REGEXLIB SEARCH ====================
+REGEXLIB_URL = "https://www.regexlib.com/Search.aspx"
+
+REGEXLIB_FIELDS = ("title", "expression", "description", "matches", "nonmatches")
+
+class RegexLibResultsParser(HTMLParser):
+    # Single pass over the page: text is collected straight from the tokenizer, never re-serialized
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.results = []
+        self.current = None
+        self.table_depth = 0
+        self.row_class = None
+        self.field = None
+        self.field_tag = None
+        self.field_depth = 0
+        self.text = []
+
+    def handle_starttag(self, tag, attrs):
+        if self.field is not None:
+            if tag == self.field_tag:
+                self.field_depth += 1
+            return
+
+        attrs = dict(attrs)
+        classes = (attrs.get('class') or "").split()
+        if tag == 'table':
+            if self.current is not None:
+                self.table_depth += 1
+            elif 'searchResultsTable' in classes:
+                self.current = {}
+                self.table_depth = 1
+            return
+        if self.current is None:
+            return
+
+        if tag == 'tr':
+            self.row_class = classes[0] if classes else None
+        elif tag == 'a' and self.row_class == 'title' and (attrs.get('href') or "").startswith("REDetails.aspx?regexp_id="):
+            self.start_field("title", tag)
+        elif tag == 'div' and 'expressionDiv' in classes:
+            self.start_field("expression", tag)
+        elif tag == 'div' and 'overflowFixDiv' in classes and self.row_class in ("description", "matches", "nonmatches"):
+            self.start_field(self.row_class, tag)
+
+    def start_field(self, field, tag):
+        if field in self.current:
+            return
+        self.field = field
+        self.field_tag = tag
+        self.field_depth = 1
+        self.text = []
+
+    def handle_endtag(self, tag):
+        if self.field is not None:
+            if tag == self.field_tag:
+                self.field_depth -= 1
+                if self.field_depth == 0:
+                    self.current[self.field] = "".join(self.text).strip()
+                    self.field = None
+            return
+
+        if tag == 'table' and self.current is not None:
+            self.table_depth -= 1
+            if self.table_depth == 0:
+                self.results.append([self.current.get(field, "N/A") for field in REGEXLIB_FIELDS])
+                self.current = None
+                self.row_class = None
+
+    def handle_data(self, data):
+        if self.field is not None:
+            self.text.append(data)
+
+def parse_regexlib_results(content):
+    if isinstance(content, bytes):
+        content = content.decode('utf-8', errors='replace')
+    parser = RegexLibResultsParser()
+    parser.feed(content)
+    parser.close()
+    return parser.results
+
+class RegexLibFetcher:
+    def __init__(self, base_url=REGEXLIB_URL, timeout=(5, 15), pool_size=4):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.session = None
+        self.lock = threading.Lock()
+
+    def get_session(self):
+        with self.lock:
+            if self.session is None:
+                import requests
+                self.session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(pool_maxsize=self.pool_size, max_retries=2)
+                self.session.mount("http://", adapter)
+                self.session.mount("https://", adapter)
+            return self.session
+
+    def __call__(self, search_query):
+        response = self.get_session().get(self.base_url, params={'k': search_query}, timeout=self.timeout)
+        response.raise_for_status()
+        return response.content
+
+class RegexLibCache:
+    def __init__(self, cache_file="regexlib_cache.json", ttl=7 * 24 * 3600):
+        self.cache_file = cache_file
+        self.ttl = ttl
+        self.entries = None
+        self.lock = threading.Lock()
+
+    def load(self):
+        if self.entries is None:
+            try:
+                with open(self.cache_file, 'r') as file:
+                    self.entries = json.load(file)
+            except (OSError, ValueError):
+                self.entries = {}
+            self.evict_expired()
+        return self.entries
+
+    def evict_expired(self):
+        now = time.time()
+        for query in [query for query, entry in self.entries.items() if now - entry['time'] > self.ttl]:
+            del self.entries[query]
+
+    def get(self, query):
+        with self.lock:
+            entry = self.load().get(query)
+            if entry and time.time() - entry['time'] <= self.ttl:
+                return entry['results']
+            return None
+
+    def put(self, query, results):
+        with self.lock:
+            entries = self.load()
+            entries[query] = {'time': time.time(), 'results': results}
+            self.evict_expired()
+            temp_file = f"{self.cache_file}.tmp"
+            with open(temp_file, 'w') as file:
+                json.dump(entries, file)
+            os.replace(temp_file, self.cache_file)
+
+class RegexLibSearch:
+    def __init__(self, fetcher=None, cache=None, max_workers=2):
+        self.fetcher = fetcher or RegexLibFetcher()
+        self.cache = cache or RegexLibCache()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="regexlib")
+
+    def search(self, search_query):
+        cache_key = " ".join(search_query.lower().split())
+        results = self.cache.get(cache_key)
+        metrics.inc("pdf_converter_cache_requests_total", cache="regexlib", result="miss" if results is None else "hit")
+        if results is None:
+            results = parse_regexlib_results(self.fetcher(search_query))
+            self.cache.put(cache_key, results)
+        return results
+
+    def submit(self, search_query):
+        return self.executor.submit(self.search, search_query)
+
+regexlib_search = RegexLibSearch()
+
+# ==================== REGEX DATABASE ====================
+REGEX_DB_FIELDS = ("title", "expression", "description", "matches", "non_matches", "data_type", "source")
+REGEX_DB_ROW = "id, title, expression, description, matches, non_matches"
+WORKBOOK_COLUMNS = {"expression": "Expression", "description": "Description", "matches": "Matches", "data_type": "Data Type"}
+
+REGEX_DB_SCHEMA = """
+CREATE TABLE IF NOT EXISTS patterns (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL DEFAULT '',
+    expression TEXT NOT NULL UNIQUE,
+    description TEXT NOT NULL DEFAULT '',
+    matches TEXT NOT NULL DEFAULT '',
+    non_matches TEXT NOT NULL DEFAULT '',
+    data_type TEXT NOT NULL DEFAULT '',
+    source TEXT NOT NULL DEFAULT ''
+);
+"""
+
+REGEX_DB_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE patterns_fts USING fts5(
+    expression, description, matches, content='patterns', content_rowid='id', tokenize='trigram'
+);
+CREATE TRIGGER patterns_ai AFTER INSERT ON patterns BEGIN
+    INSERT INTO patterns_fts(rowid, expression, description, matches) VALUES (new.id, new.expression, new.description, new.matches);
+END;
+CREATE TRIGGER patterns_ad AFTER DELETE ON patterns BEGIN
+    INSERT INTO patterns_fts(patterns_fts, rowid, expression, description, matches) VALUES ('delete', old.id, old.expression, old.description, old.matches);
+END;
+CREATE TRIGGER patterns_au AFTER UPDATE ON patterns BEGIN
+    INSERT INTO patterns_fts(patterns_fts, rowid, expression, description, matches) VALUES ('delete', old.id, old.expression, old.description, old.matches);
+    INSERT INTO patterns_fts(rowid, expression, description, matches) VALUES (new.id, new.expression, new.description, new.matches);
+END;
+INSERT INTO patterns_fts(patterns_fts) VALUES ('rebuild');
+"""
+
+class RegexDatabase:
+    # SQLite pattern library, seeded once from regex_database.xlsx on first use
+    def __init__(self, db_file="regex_library.db", workbook_file="regex_database.xlsx"):
+        self.db_file = db_file
+        self.workbook_file = workbook_file
+        self.connection = None
+        self.fts = False
+        self.lock = threading.RLock()
+
+    def connect(self):
+        # The connection is only kept once the first-use import went through; a failed import is retried
+        # on the next call instead of leaving an empty library for the rest of the session
+        with self.lock:
+            if self.connection is None:
+                connection = sqlite3.connect(self.db_file, check_same_thread=False)
+                try:
+                    connection.executescript(REGEX_DB_SCHEMA)
+                    self.fts = self.create_fts_index(connection)
+                    if connection.execute("PRAGMA user_version").fetchone()[0] == 0:
+                        if self.workbook_file and os.path.exists(self.workbook_file):
+                            self.import_workbook(self.workbook_file, connection)
+                        connection.execute("PRAGMA user_version = 1")
+                except Exception:
+                    connection.close()
+                    raise
+                self.connection = connection
+            return self.connection
+
+    def create_fts_index(self, connection):
+        if connection.execute("SELECT 1 FROM sqlite_master WHERE name = 'patterns_fts'").fetchone():
+            return True
+        try:
+            with connection:
+                connection.executescript(REGEX_DB_FTS_SCHEMA)
+            return True
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5 or the trigram tokenizer; searches fall back to LIKE
+            return False
+
+    def upsert(self, connection, pattern):
+        fields = [field for field in REGEX_DB_FIELDS if field in pattern]
+        updates = ", ".join(f"{field} = excluded.{field}" for field in fields if field != "expression")
+        connection.execute(
+            f"INSERT INTO patterns ({', '.join(fields)}) VALUES ({', '.join('?' * len(fields))}) "
+            f"ON CONFLICT(expression) DO UPDATE SET {updates or 'expression = excluded.expression'}",
+            [pattern[field] for field in fields])
+        return connection.execute("SELECT id FROM patterns WHERE expression = ?", (pattern['expression'],)).fetchone()[0]
+
+    def import_workbook(self, workbook_file, connection=None):
+        import pandas as pd
+        df = pd.read_excel(workbook_file).fillna("").astype(str)
+        imported = 0
+        with self.lock:
+            connection = connection or self.connect()
+            with connection:
+                for record in df.to_dict('records'):
+                    pattern = {field: record.get(column, "").strip() for field, column in WORKBOOK_COLUMNS.items()}
+                    if pattern['expression']:
+                        pattern['source'] = os.path.basename(workbook_file)
+                        self.upsert(connection, pattern)
+                        imported += 1
+        return imported
+
+    def add(self, expression, **fields):
+        pattern = {field: value for field, value in fields.items() if field in REGEX_DB_FIELDS}
+        pattern['expression'] = expression
+        with self.lock:
+            connection = self.connect()
+            with connection:
+                return self.upsert(connection, pattern)
+
+    def update(self, pattern_id, **fields):
+        fields = {field: value for field, value in fields.items() if field in REGEX_DB_FIELDS}
+        if not fields:
+            return
+        with self.lock:
+            connection = self.connect()
+            with connection:
+                connection.execute(
+                    f"UPDATE patterns SET {', '.join(f'{field} = ?' for field in fields)} WHERE id = ?",
+                    list(fields.values()) + [pattern_id])
+
+    def delete(self, pattern_id):
+        with self.lock:
+            connection = self.connect()
+            with connection:
+                connection.execute("DELETE FROM patterns WHERE id = ?", (pattern_id,))
+
+    def all_rows(self):
+        with self.lock:
+            return self.connect().execute(f"SELECT {REGEX_DB_ROW} FROM patterns ORDER BY id").fetchall()
+
+    def search(self, search_query):
+        with self.lock:
+            connection = self.connect()
+            if self.fts and len(search_query) >= 3:
+                phrase = '"' + search_query.replace('"', '""') + '"'
+                return connection.execute(
+                    f"SELECT {REGEX_DB_ROW} FROM patterns WHERE id IN "
+                    f"(SELECT rowid FROM patterns_fts WHERE patterns_fts MATCH ?) ORDER BY id", (phrase,)).fetchall()
+
+            like = "%" + re.sub(r'([\\%_])', r'\\\1', search_query) + "%"
+            return connection.execute(
+                f"SELECT {REGEX_DB_ROW} FROM patterns WHERE expression LIKE ?1 ESCAPE '\\' "
+                f"OR description LIKE ?1 ESCAPE '\\' OR matches LIKE ?1 ESCAPE '\\' ORDER BY id", (like,)).fetchall()
+
+regex_database = RegexDatabase()
+
+# ==================== PATTERN TESTER ====================
+class PdfTextCache:
+    # Extracted text is reused for as long as the PDF is unchanged on disk
+    def __init__(self, max_entries=32, cache_dir=None):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def disk_path(self, key):
+        return os.path.join(self.cache_dir, hashlib.sha1(key.encode('utf-8')).hexdigest() + ".json")
+
+    def load_from_disk(self, key, signature):
+        try:
+            with open(self.disk_path(key), 'r') as file:
+                entry = json.load(file)
+        except (OSError, ValueError):
+            return None
+        return entry['text'] if entry.get('signature') == list(signature) else None
+
+    def save_to_disk(self, key, signature, text):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        temp_file = f"{self.disk_path(key)}.tmp"
+        with open(temp_file, 'w') as file:
+            json.dump({'path': key, 'signature': list(signature), 'text': text}, file)
+        os.replace(temp_file, self.disk_path(key))
+
+    def get(self, pdf_path, extract=extract_text_from_pdf):
+        stat = os.stat(pdf_path)
+        key = os.path.abspath(pdf_path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and entry[0] == signature:
+                self.entries.move_to_end(key)
+                metrics.inc("pdf_converter_cache_requests_total", cache="pdf_text", result="hit")
+                return entry[1]
+
+        text = self.load_from_disk(key, signature) if self.cache_dir else None
+        metrics.inc("pdf_converter_cache_requests_total", cache="pdf_text", result="miss" if text is None else "hit")
+        if text is None:
+            text = extract(pdf_path)
+            if self.cache_dir:
+                self.save_to_disk(key, signature, text)
+        with self.lock:
+            self.entries[key] = (signature, text)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return text
+
+pdf_text_cache = PdfTextCache(cache_dir="text_cache")
+
+def test_pattern(text, regex_pattern, limit=500):
+    compiled = re.compile(regex_pattern, re.MULTILINE)
+    rows = []
+    timings = []
+    start = last = time.perf_counter()
+    for match in compiled.finditer(text):
+        now = time.perf_counter()
+        timings.append(now - last)
+        last = now
+        if len(rows) < limit:
+            # Same shape as re.findall, which is what the converter writes out
+            rows.append(match.groups() or (match.group(0),))
+    return {
+        'groups': compiled.groups,
+        'count': len(timings),
+        'rows': rows,
+        'timings': timings[:limit],
+        'total': time.perf_counter() - start,
+        'max': max(timings, default=0.0),
+    }
+
+class PatternTester:
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pattern-tester")
+
+    def __init__(self, converter, debounce=300):
+        self.converter = converter
+        self.debounce = debounce
+        self.pending = None
+        self.generation = 0
+
+        self.top = tk.Toplevel(converter.tab)
+        self.top.title("Pattern Tester")
+        self.top.grid_columnconfigure(1, weight=1)
+        self.top.grid_rowconfigure(2, weight=1)
+
+        ttk.Label(self.top, text="Sample PDF:").grid(row=0, column=0, sticky="w", padx=10, pady=5)
+        self.sample_var = tk.StringVar()
+        samples = self.list_samples()
+        sample_menu = ttk.Combobox(self.top, textvariable=self.sample_var, values=samples, state="readonly", width=60)
+        sample_menu.grid(row=0, column=1, padx=10, pady=5, sticky="ew")
+        sample_menu.bind("<<ComboboxSelected>>", self.schedule)
+        if samples:
+            sample_menu.current(0)
+
+        self.summary_var = tk.StringVar()
+        ttk.Label(self.top, textvariable=self.summary_var).grid(row=1, column=0, columnspan=2, sticky="w", padx=10, pady=5)
+
+        self.results_tree = ttk.Treeview(self.top, show="headings", height=15)
+        self.results_tree.grid(row=2, column=0, columnspan=2, sticky="nsew", padx=(10, 0), pady=10)
+        results_scrollbar = ttk.Scrollbar(self.top, orient="vertical", command=self.results_tree.yview)
+        results_scrollbar.grid(row=2, column=2, sticky="ns", pady=10)
+        self.results_view = PagedTreeview(self.results_tree, results_scrollbar)
+
+        self.trace_id = converter.regex_var.trace_add("write", self.schedule)
+        self.top.protocol("WM_DELETE_WINDOW", self.close)
+        self.schedule()
+
+    def list_samples(self):
+        input_folder = self.converter.input_entry.get()
+        if not input_folder or not os.path.isdir(input_folder):
+            return []
+        return sorted(file for file in os.listdir(input_folder) if file.endswith('.pdf'))
+
+    def schedule(self, *args):
+        # Only the last edit inside the debounce window gets evaluated
+        if self.pending is not None:
+            self.top.after_cancel(self.pending)
+        self.pending = self.top.after(self.debounce, self.run)
+
+    def run(self):
+        self.pending = None
+        sample = self.sample_var.get()
+        regex_pattern = self.converter.regex_var.get().strip()
+        if not sample or not regex_pattern:
+            self.summary_var.set("Select a sample PDF and enter a regex pattern.")
+            return
+
+        self.generation += 1
+        generation = self.generation
+        column_names = [col.strip() for col in self.converter.columns_entry.get().split(',') if col.strip()]
+        pdf_path = os.path.join(self.converter.input_entry.get(), sample)
+        self.summary_var.set("Testing...")
+        future = self.executor.submit(self.evaluate, pdf_path, regex_pattern)
+        when_done(self.converter.tab, future, lambda future: self.show_results(future, generation, column_names))
+
+    def evaluate(self, pdf_path, regex_pattern):
+        text = pdf_text_cache.get(pdf_path, self.converter.extract_text_from_pdf)
+        return test_pattern(text, regex_pattern)
+
+    def show_results(self, future, generation, column_names):
+        # Results for an older edit, or for a window that has since been closed, are dropped
+        if generation != self.generation or not self.top.winfo_exists():
+            return
+        try:
+            result = future.result()
+        except re.error as e:
+            self.summary_var.set(f"Invalid pattern: {e}")
+            self.results_view.clear()
+            return
+        except Exception as e:
+            self.summary_var.set(f"Failed to test pattern: {e}")
+            self.results_view.clear()
+            return
+
+        group_count = max(result['groups'], 1)
+        headings = column_names[:group_count] + [f"Group {idx + 1}" for idx in range(len(column_names), group_count)]
+        columns = ["#", "Time (ms)"] + headings
+        self.results_tree.configure(columns=columns)
+        for col in columns:
+            self.results_tree.heading(col, text=col)
+
+        summary = (f"{result['count']} matches in {result['total'] * 1000:.1f} ms "
+                   f"(slowest match {result['max'] * 1000:.2f} ms)")
+        if column_names and result['groups'] != len(column_names):
+            summary += f" - pattern has {result['groups']} groups but {len(column_names)} column names"
+        self.summary_var.set(summary)
+
+        self.results_view.set_rows([
+            (None, (idx + 1, f"{timing * 1000:.3f}") + tuple(row))
+            for idx, (row, timing) in enumerate(zip(result['rows'], result['timings']))
+        ])
+
+    def close(self):
+        self.converter.regex_var.trace_remove("write", self.trace_id)
+        if self.pending is not None:
+            self.top.after_cancel(self.pending)
+        self.top.destroy()
+
+# ==================== STAGE TIMINGS ====================
+# Upper bounds (seconds) of the latency histogram buckets
+STAGE_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, float('inf'))
+STAGE_ORDER = ("open", "extract", "match", "frame", "write", "file")
+
+def percentile(values, fraction):
+    # Nearest-rank percentile
+    ordered = sorted(values)
+    return ordered[max(math.ceil(fraction * len(ordered)) - 1, 0)]
+
+class StageTimer:
+    # Wall-clock time per conversion stage. Each measured call is one sample, so "extract" gets one per
+    # page and the other stages one per file. start_file() begins the per-file totals.
+    def __init__(self):
+        self.samples = {}
+        self.current = {}
+
+    @contextmanager
+    def measure(self, stage):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - started)
+
+    def record(self, stage, seconds):
+        metrics.observe("pdf_converter_stage_seconds", seconds, stage=stage)
+        self.samples.setdefault(stage, []).append(seconds)
+        self.current.setdefault(stage, []).append(seconds)
+
+    def start_file(self):
+        self.current = {}
+
+    def file_stages(self):
+        return {stage: round(sum(values), 4) for stage, values in self.current.items()}
+
+    def file_count(self, stage):
+        return len(self.current.get(stage, []))
+
+    def summary(self):
+        report = {}
+        for stage in sorted(self.samples, key=lambda name: (STAGE_ORDER + (name,)).index(name)):
+            values = sorted(self.samples[stage])
+            report[stage] = {
+                'count': len(values),
+                'total': sum(values),
+                'p50': percentile(values, 0.5),
+                'p95': percentile(values, 0.95),
+                'max': values[-1],
+                # Cumulative counts per STAGE_BUCKETS bound
+                'buckets': [bisect.bisect_right(values, bound) for bound in STAGE_BUCKETS],
+            }
+        return report
+
+    def format_summary(self):
+        return "\n".join(f"{stage}: p50 {stats['p50'] * 1000:.1f} ms, p95 {stats['p95'] * 1000:.1f} ms, "
+                         f"max {stats['max'] * 1000:.1f} ms ({stats['count']} samples)"
+                         for stage, stats in self.summary().items())
+
+# ==================== METRICS ====================
+METRIC_HELP = {
+    'pdf_converter_files_total': ("counter", "PDF files processed, by outcome"),
+    'pdf_converter_pages_total': ("counter", "PDF pages processed"),
+    'pdf_converter_rows_total': ("counter", "Rows extracted into Excel output"),
+    'pdf_converter_failures_total': ("counter", "Files that failed to convert, by exception type"),
+    'pdf_converter_cache_requests_total': ("counter", "Cache lookups, by cache and hit or miss"),
+    'pdf_converter_stage_seconds': ("histogram", "Time spent in each conversion stage"),
+    'pdf_converter_cache_hit_ratio': ("gauge", "Share of cache lookups that were hits"),
+    'pdf_converter_queue_depth': ("gauge", "Files of the current runs not processed yet"),
+    'pdf_converter_log_queue_depth': ("gauge", "Run log events waiting to be written"),
+    'pdf_converter_resident_memory_bytes': ("gauge", "Resident set size of the converter process"),
+}
+
+def process_rss():
+    # Resident set size of this process in bytes, or None where it cannot be read
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    if os.name == 'nt':
+        import ctypes
+        from ctypes import wintypes
+
+        class ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD)] + [
+                (name, ctypes.c_size_t) for name in ("PeakWorkingSetSize", "WorkingSetSize", "QuotaPeakPagedPoolUsage",
+                                                     "QuotaPagedPoolUsage", "QuotaPeakNonPagedPoolUsage",
+                                                     "QuotaNonPagedPoolUsage", "PagefileUsage", "PeakPagefileUsage")]
+
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        if ctypes.windll.psapi.GetProcessMemoryInfo(ctypes.windll.kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb):
+            return counters.WorkingSetSize
+    return None
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in labels)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(labels, escaped)) + "}"
+
+class Metrics:
+    # Process-wide counters and stage histograms, rendered in the Prometheus text format.
+    # Conversion events arrive through the run logger, stage times through StageTimer.
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+        self.queue_depth = 0
+
+    def inc(self, name, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def observe(self, name, seconds, **labels):
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            # Cumulative bucket counts, then sum and count
+            histogram = self.histograms.setdefault(name, {}).setdefault(key, [0] * len(STAGE_BUCKETS) + [0.0, 0])
+            for idx, bound in enumerate(STAGE_BUCKETS):
+                if seconds <= bound:
+                    histogram[idx] += 1
+            histogram[-2] += seconds
+            histogram[-1] += 1
+
+    def record_event(self, event, fields):
+        if event == "run_start":
+            with self.lock:
+                self.queue_depth += fields.get('files', 0)
+        elif event in ("file_done", "file_empty", "file_failed"):
+            with self.lock:
+                self.queue_depth = max(self.queue_depth - 1, 0)
+            self.inc("pdf_converter_files_total", status=event[len("file_"):])
+            if fields.get('pages'):
+                self.inc("pdf_converter_pages_total", fields['pages'])
+            if fields.get('rows'):
+                self.inc("pdf_converter_rows_total", fields['rows'])
+            if event == "file_failed":
+                self.inc("pdf_converter_failures_total", error=fields.get('error', "Exception"))
+
+    def render(self):
+        with self.lock:
+            counters = {name: dict(series) for name, series in self.counters.items()}
+            histograms = {name: {key: list(values) for key, values in series.items()} for name, series in self.histograms.items()}
+            gauges = {'pdf_converter_queue_depth': {(): self.queue_depth}}
+
+        requests_by_cache = {}
+        for key, count in counters.get('pdf_converter_cache_requests_total', {}).items():
+            labels = dict(key)
+            hits_and_total = requests_by_cache.setdefault(labels['cache'], [0, 0])
+            hits_and_total[0] += count if labels['result'] == "hit" else 0
+            hits_and_total[1] += count
+        gauges['pdf_converter_cache_hit_ratio'] = {(("cache", cache),): hits / total for cache, (hits, total) in requests_by_cache.items()}
+        gauges['pdf_converter_log_queue_depth'] = {(): run_logger.queue.qsize()}
+        rss = process_rss()
+        if rss is not None:
+            gauges['pdf_converter_resident_memory_bytes'] = {(): rss}
+
+        lines = []
+        for name, (kind, help_text) in METRIC_HELP.items():
+            series = (counters if kind == "counter" else histograms if kind == "histogram" else gauges).get(name)
+            if not series:
+                continue
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for key, value in sorted(series.items()):
+                if kind != "histogram":
+                    lines.append(f"{name}{format_labels(key)} {value}")
+                    continue
+                for bound, count in zip(STAGE_BUCKETS, value):
+                    le = "+Inf" if bound == float('inf') else repr(bound)
+                    lines.append(f"{name}_bucket{format_labels(key + (('le', le),))} {count}")
+                lines.append(f"{name}_sum{format_labels(key)} {value[-2]}")
+                lines.append(f"{name}_count{format_labels(key)} {value[-1]}")
+        return "\n".join(lines) + "\n"
+
+metrics = Metrics()
+
+def write_metrics_textfile(path):
+    # Written whole and renamed into place, so a textfile collector never reads half a file
+    temp_file = f"{path}.tmp"
+    with open(temp_file, 'w', encoding='utf-8') as file:
+        file.write(metrics.render())
+    os.replace(temp_file, path)
+
+def export_metrics_textfile(path, interval=15):
+    def export():
+        while True:
+            time.sleep(interval)
+            write_metrics_textfile(path)
+
+    threading.Thread(target=export, daemon=True).start()
+    atexit.register(write_metrics_textfile, path)
+
+# ==================== CONVERSION PROFILER ====================
+def profile_library(function):
+    # Which library a pstats function key (filename, line, name) belongs to, if any we report on
+    filename, _, name = function
+    path = filename.replace("\\", "/")
+    # pdfminer does the parsing behind pdfplumber, so its time counts as pdfplumber's
+    if "/pdfplumber/" in path or "/pdfminer/" in path:
+        return "pdfplumber"
+    if "/pandas/" in path:
+        return "pandas"
+    if (re.search(r"/(re/\w+|re|sre_\w+)\.py$", path)
+            or filename == "~" and ("re.Pattern" in name or "_sre" in name)):
+        return "re"
+    return None
+
+class ConversionProfiler:
+    # cProfile for a conversion batch. Mode "run" profiles the whole batch; mode "slowest" profiles each
+    # file on its own and keeps the profiles of the `keep` slowest. save() writes the .prof files and a
+    # summary of the top pdfplumber, re and pandas functions into the output folder.
+    def __init__(self, mode="run", keep=5, top=10):
+        self.mode = mode
+        self.keep = keep
+        self.top = top
+        self.profile = None
+        self.started = None
+        self.slowest = []
+        self.saved_files = []
+
+    def start_run(self):
+        if self.mode == "run":
+            import cProfile
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+
+    def stop_run(self):
+        if self.mode == "run":
+            self.profile.disable()
+
+    def start_file(self):
+        if self.mode == "slowest":
+            import cProfile
+            self.profile = cProfile.Profile()
+            self.started = time.perf_counter()
+            self.profile.enable()
+
+    def end_file(self, pdf_file):
+        if self.mode != "slowest":
+            return
+        self.profile.disable()
+        self.slowest.append((time.perf_counter() - self.started, pdf_file, self.profile))
+        self.slowest.sort(key=lambda item: item[0], reverse=True)
+        del self.slowest[self.keep:]
+
+    def save(self, output_folder):
+        os.makedirs(output_folder, exist_ok=True)
+        if self.mode == "run":
+            profiles = [("run", self.profile)]
+            header = ["Profile of the whole run"]
+        else:
+            profiles = [(os.path.splitext(pdf_file)[0], profile) for _, pdf_file, profile in self.slowest]
+            header = [f"Profiles of the {len(self.slowest)} slowest files:"]
+            header += [f"  {pdf_file}: {seconds:.3f} s" for seconds, pdf_file, _ in self.slowest]
+        if not profiles or profiles[0][1] is None:
+            return None
+
+        for name, profile in profiles:
+            prof_file = os.path.join(output_folder, f"profile_{name}.prof")
+            profile.dump_stats(prof_file)
+            self.saved_files.append(prof_file)
+
+        import pstats
+        stats = pstats.Stats(*(profile for _, profile in profiles))
+        summary = "\n".join(header + ["", self.library_summary(stats)])
+        summary_file = os.path.join(output_folder, "profile_summary.txt")
+        with open(summary_file, 'w', encoding='utf-8') as file:
+            file.write(summary + "\n")
+        self.saved_files.append(summary_file)
+        return summary
+
+    def library_summary(self, stats):
+        by_library = {}
+        for function, (_, calls, _, cumulative, _) in stats.stats.items():
+            library = profile_library(function)
+            if library:
+                by_library.setdefault(library, []).append((cumulative, calls, function))
+
+        lines = ["Top functions by cumulative time:"]
+        for library in ("pdfplumber", "re", "pandas"):
+            lines.append(f"\n{library}:")
+            entries = sorted(by_library.get(library, []), reverse=True)[:self.top]
+            if not entries:
+                lines.append("  (not called)")
+            for cumulative, calls, (filename, line, name) in entries:
+                location = name if filename == "~" else f"{os.path.basename(filename)}:{line}({name})"
+                lines.append(f"  {cumulative:9.3f} s {calls:>9} calls  {location}")
+        return "\n".join(lines)
+
 # ==================== PROGRAM 1: INVISIBLE GRID CONVERTER ====================
 class InvisibleGridConverter:
-    def __init__(self, tab):
+    def __init__(self, tab=None, regex_search=None):
         self.tab = tab
-        self.setup_ui()
+        self.regex_search = regex_search or regexlib_search
+        # Without a tab the converter is headless, as the command line uses it
+        if tab is not None:
+            self.setup_ui()
     
     def setup_ui(self):
         # Input Folder
@@ -76,7 +1117,8 @@ class InvisibleGridConverter:
 
         # Regex Pattern
         ttk.Label(self.tab, text="Regex Pattern:").grid(row=3, column=0, sticky="w", padx=10, pady=5)
-        self.regex_entry = ttk.Entry(self.tab, width=50)
+        self.regex_var = tk.StringVar()
+        self.regex_entry = ttk.Entry(self.tab, width=50, textvariable=self.regex_var)
         self.regex_entry.grid(row=3, column=1, padx=10, pady=5)
 
         # Search Bar for Regex Query
@@ -90,7 +1132,10 @@ class InvisibleGridConverter:
         self.results_tree = ttk.Treeview(self.tab, columns=columns, show="headings")
         for col in columns:
             self.results_tree.heading(col, text=col)
-        self.results_tree.grid(row=5, column=0, columnspan=3, padx=10, pady=10)
+        self.results_tree.grid(row=5, column=0, columnspan=3, padx=(10, 0), pady=10)
+        results_scrollbar = ttk.Scrollbar(self.tab, orient="vertical", command=self.results_tree.yview)
+        results_scrollbar.grid(row=5, column=3, sticky="ns", pady=10)
+        self.results_view = PagedTreeview(self.results_tree, results_scrollbar)
         setup_context_menu(self.results_tree)
 
         # db Regex Patterns
@@ -109,74 +1154,81 @@ class InvisibleGridConverter:
         
         ttk.Button(button_frame, text="Save Config", command=self.save_config).grid(row=0, column=0, padx=10)
         ttk.Button(button_frame, text="Load Config", command=self.load_config).grid(row=0, column=1, padx=10)
-        ttk.Button(button_frame, text="Convert", command=self.start_conversion).grid(row=0, column=2, padx=10)
+        ttk.Button(button_frame, text="Test Pattern", command=self.open_pattern_tester).grid(row=0, column=2, padx=10)
+        ttk.Button(button_frame, text="Convert", command=self.start_conversion).grid(row=0, column=3, padx=10)
 
-    def extract_text_from_pdf(self, pdf_path):
-        extracted_text = []
-        with pdfplumber.open(pdf_path) as pdf:
-            for page in pdf.pages:
-                text = page.extract_text()
-                if text:
-                    extracted_text.append(text)
-        return " ".join(extracted_text)
+    def extract_text_from_pdf(self, pdf_path, timer=None):
+        return extract_text_from_pdf(pdf_path, timer)
+
+    def open_pattern_tester(self):
+        if not self.input_entry.get():
+            messagebox.showerror("Error", "Please select an input folder with a sample PDF.")
+            return
+        PatternTester(self)
 
     def process_text_data(self, text, regex_pattern):
         return re.findall(regex_pattern, text, re.MULTILINE)
 
-    def save_to_excel(self, data, column_names, output_file):
-        df = pd.DataFrame(data, columns=column_names)
+    def save_to_excel(self, data, column_names, output_file, timer=None):
+        import pandas as pd
+        timer = timer or StageTimer()
+        with timer.measure("frame"):
+            df = pd.DataFrame(data, columns=column_names)
         os.makedirs(os.path.dirname(output_file), exist_ok=True)
-        df.to_excel(output_file, index=False)
+        with timer.measure("write"):
+            df.to_excel(output_file, index=False)
 
-    def convert_pdfs_to_excel(self, input_folder, output_folder, column_names, regex_pattern):
+    def convert_pdfs_to_excel(self, input_folder, output_folder, column_names, regex_pattern, profiler=None):
         pdf_files = [file for file in os.listdir(input_folder) if file.endswith('.pdf')]
+        run_id = run_logger.start_run(converter="invisible_grid", input_folder=input_folder, files=len(pdf_files))
+        timer = StageTimer()
         if not pdf_files:
-            log_message("No PDF files found in the input folder.")
-            return
-
-        log_message("Processing started.")
+            run_logger.event(run_id, "run_end", files=0, failed=0, message="No PDF files found in the input folder.")
+            return timer
 
+        profiler = profiler or ConversionProfiler(mode=None)
+        profiler.start_run()
+        run_started = time.perf_counter()
+        failed = 0
         for pdf_file in pdf_files:
+            started = time.perf_counter()
+            timer.start_file()
+            profiler.start_file()
             try:
                 pdf_path = os.path.join(input_folder, pdf_file)
                 pdf_name = os.path.splitext(pdf_file)[0]
-                extracted_text = self.extract_text_from_pdf(pdf_path)
-                extracted_data = self.process_text_data(extracted_text, regex_pattern)
+                extracted_text = self.extract_text_from_pdf(pdf_path, timer)
+                with timer.measure("match"):
+                    extracted_data = self.process_text_data(extracted_text, regex_pattern)
 
                 if extracted_data:
                     output_file = os.path.join(output_folder, f"{pdf_name}.xlsx")
-                    self.save_to_excel(extracted_data, column_names, output_file)
-                    log_message(f"Successfully processed {pdf_file} and saved to {output_file}.")
+                    self.save_to_excel(extracted_data, column_names, output_file, timer)
+                    timer.record("file", time.perf_counter() - started)
+                    run_logger.event(run_id, "file_done", file=pdf_file, pages=timer.file_count("extract"), rows=len(extracted_data),
+                                     output=output_file, seconds=round(time.perf_counter() - started, 4), stages=timer.file_stages())
                 else:
-                    log_message(f"No matches found in {pdf_file}.")
+                    timer.record("file", time.perf_counter() - started)
+                    run_logger.event(run_id, "file_empty", file=pdf_file, pages=timer.file_count("extract"), rows=0,
+                                     seconds=round(time.perf_counter() - started, 4), stages=timer.file_stages())
 
             except Exception as e:
-                log_message(f"Failed to process {pdf_file}. Error: {str(e)}")
+                failed += 1
+                run_logger.event(run_id, "file_failed", file=pdf_file, error=type(e).__name__, message=str(e),
+                                 seconds=round(time.perf_counter() - started, 4), stages=timer.file_stages())
                 continue
+            finally:
+                profiler.end_file(pdf_file)
+
+        profiler.stop_run()
+        run_logger.event(run_id, "run_end", files=len(pdf_files), failed=failed, seconds=round(time.perf_counter() - run_started, 4),
+                         stages=timer.summary())
+        if profiler.mode:
+            profiler.save(output_folder)
+        return timer
 
     def scrape_regex_data(self, search_query):
-        url = f"https://www.regexlib.com/Search.aspx?k={search_query}"
-        response = requests.get(url)
-        soup = BeautifulSoup(response.content, 'html.parser')
-        tables = soup.find_all('table', class_='searchResultsTable')
-
-        data = []
-        for table in tables:
-            table_html = str(table)
-            title_match = re.search(r'<tr class="title".*?<a href="REDetails\.aspx\?regexp_id=\d+">(.*?)</a>', table_html, re.DOTALL)
-            expression_match = re.search(r'<div class="expressionDiv">(.*?)</div>', table_html, re.DOTALL)
-            description_match = re.search(r'<tr class="description".*?<div class="overflowFixDiv">(.*?)</div>', table_html, re.DOTALL)
-            matches_match = re.search(r'<tr class="matches".*?<div class="overflowFixDiv">(.*?)</div>', table_html, re.DOTALL)
-            non_matches_match = re.search(r'<tr class="nonmatches".*?<div class="overflowFixDiv">(.*?)</div>', table_html, re.DOTALL)
-
-            title = title_match.group(1).strip() if title_match else "N/A"
-            expression = expression_match.group(1).strip() if expression_match else "N/A"
-            description = description_match.group(1).strip() if description_match else "N/A"
-            matches = re.sub(r'<.*?>', '', matches_match.group(1)).strip() if matches_match else "N/A"
-            non_matches = re.sub(r'<.*?>', '', non_matches_match.group(1)).strip() if non_matches_match else "N/A"
-
-            data.append([title, expression, description, matches, non_matches])
-        return data
+        return self.regex_search.search(search_query)
 
     def display_regex_results(self):
         search_query = self.search_entry.get().strip()
@@ -184,19 +1236,22 @@ class InvisibleGridConverter:
             messagebox.showerror("Error", "Please enter a search query.")
             return
 
-        data = self.scrape_regex_data(search_query)
-        for row in self.results_tree.get_children():
-            self.results_tree.delete(row)
-        for item in data:
-            self.results_tree.insert("", "end", values=item)
+        future = self.regex_search.submit(search_query)
+        when_done(self.tab, future, self.show_regex_results)
+
+    def show_regex_results(self, future):
+        try:
+            data = future.result()
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to search regexlib: {e}")
+            return
+
+        self.results_view.set_rows([(None, item) for item in data])
 
     def load_db_regex(self):
         try:
-            df = pd.read_excel("regex_database.xlsx")
-            for row in self.results_tree.get_children():
-                self.results_tree.delete(row)
-            for _, row in df.iterrows():
-                self.results_tree.insert("", "end", values=("", row['Expression'], row['Description'], row['Matches']))
+            rows = regex_database.all_rows()
+            self.results_view.set_rows([(f"db-{row[0]}", row[1:]) for row in rows])
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load db regex: {e}")
 
@@ -207,12 +1262,8 @@ class InvisibleGridConverter:
             return
 
         try:
-            df = pd.read_excel("regex_database.xlsx")
-            filtered_df = df[df.apply(lambda row: row.astype(str).str.contains(search_query, case=False), axis=1).any(axis=1)]
-            for row in self.results_tree.get_children():
-                self.results_tree.delete(row)
-            for _, row in filtered_df.iterrows():
-                self.results_tree.insert("", "end", values=("", row['Expression'], row['Description'], row['Matches']))
+            rows = regex_database.search(search_query)
+            self.results_view.set_rows([(f"db-{row[0]}", row[1:]) for row in rows])
         except Exception as e:
             messagebox.showerror("Error", f"Failed to search db regex: {e}")
 
@@ -262,16 +1313,19 @@ class InvisibleGridConverter:
             return
 
         try:
-            self.convert_pdfs_to_excel(input_folder, output_folder, column_names, regex_pattern)
-            messagebox.showinfo("Success", "PDFs successfully converted to Excel.")
+            timer = self.convert_pdfs_to_excel(input_folder, output_folder, column_names, regex_pattern)
+            messagebox.showinfo("Success", f"PDFs successfully converted to Excel.\n\n{timer.format_summary()}")
         except Exception as e:
             messagebox.showerror("Error", f"An error occurred: {e}")
 
 # ==================== PROGRAM 2: GRID-BASED CONVERTER ====================
 class GridBasedConverter:
-    def __init__(self, tab):
+    def __init__(self, tab=None, regex_search=None):
         self.tab = tab
-        self.setup_ui()
+        self.regex_search = regex_search or regexlib_search
+        # Without a tab the converter is headless, as the command line uses it
+        if tab is not None:
+            self.setup_ui()
     
     def setup_ui(self):
         # Input Folder
@@ -287,7 +1341,7 @@ class GridBasedConverter:
         ttk.Button(self.tab, text="Browse", command=lambda: browse_folder(self.output_entry)).grid(row=1, column=2, padx=10, pady=5, sticky="w")
 
         # Column Names
-        ttk.Label(self.tab, text="Column Names (comma-separated):").grid(row=2, column=0, sticky="w", padx=10, pady=5)
+        ttk.Label(self.tab, text="Column Names (blank = PDF header):").grid(row=2, column=0, sticky="w", padx=10, pady=5)
         self.columns_entry = ttk.Entry(self.tab, width=50)
         self.columns_entry.grid(row=2, column=1, padx=10, pady=5)
 
@@ -312,7 +1366,10 @@ class GridBasedConverter:
         self.results_tree = ttk.Treeview(self.tab, columns=columns, show="headings")
         for col in columns:
             self.results_tree.heading(col, text=col)
-        self.results_tree.grid(row=6, column=0, columnspan=3, padx=10, pady=10)
+        self.results_tree.grid(row=6, column=0, columnspan=3, padx=(10, 0), pady=10)
+        results_scrollbar = ttk.Scrollbar(self.tab, orient="vertical", command=self.results_tree.yview)
+        results_scrollbar.grid(row=6, column=3, sticky="ns", pady=10)
+        self.results_view = PagedTreeview(self.results_tree, results_scrollbar)
         setup_context_menu(self.results_tree)
 
         # db Regex Patterns
@@ -333,23 +1390,72 @@ class GridBasedConverter:
         ttk.Button(button_frame, text="Load Config", command=self.load_config).grid(row=0, column=1, padx=10)
         ttk.Button(button_frame, text="Convert", command=self.start_conversion).grid(row=0, column=2, padx=10)
 
-    def extract_information(self, pdf_path):
-        pdf_obj = pdfplumber.open(pdf_path)
-        return len(pdf_obj.pages), pdf_obj
+    def extract_information(self, pdf_path, timer=None):
+        import pdfplumber
+        timer = timer or StageTimer()
+        with timer.measure("open"):
+            pdf_obj = pdfplumber.open(pdf_path)
+            return len(pdf_obj.pages), pdf_obj
 
-    def process_pdf(self, pdf_obj, page_count, column_names, regex_pattern, filter_index):
+    def normalize_row(self, row):
+        return tuple(" ".join(str(cell).split()) if cell is not None else "" for cell in row)
+
+    def detect_header_row(self, row, regex_pattern, filter_index):
+        # A header row has text in it and does not itself pass the data-row filter
+        if not row or not any(cell for cell in row):
+            return None
+        if len(row) > filter_index and re.match(regex_pattern, str(row[filter_index])):
+            return None
+        return self.normalize_row(row)
+
+    def header_column_names(self, header):
+        column_names = []
+        for idx, cell in enumerate(header):
+            name = cell or f"Column {idx + 1}"
+            if name in column_names:
+                name = f"{name} ({idx + 1})"
+            column_names.append(name)
+        return column_names
+
+    def process_pdf(self, pdf_obj, page_count, column_names, regex_pattern, filter_index, timer=None):
+        timer = timer or StageTimer()
         extracted_data = []
+        header = None
+        first_table = True
         for i in range(page_count):
             page = pdf_obj.pages[i]
-            table_data = page.extract_table()
-            if table_data:
-                extracted_data.extend(table_data)
+            with timer.measure("extract"):
+                table_data = page.extract_table()
+            if not table_data:
+                continue
+
+            # Header comes from the first page's table; continuation pages repeat it as their first row
+            if first_table:
+                first_table = False
+                header = self.detect_header_row(table_data[0], regex_pattern, filter_index)
+                if header is not None:
+                    table_data = table_data[1:]
+            elif header is not None and table_data[0] and self.normalize_row(table_data[0]) == header:
+                table_data = table_data[1:]
+
+            extracted_data.extend(table_data)
         
+        with timer.measure("match"):
+            return self.filter_rows(extracted_data, header, column_names, regex_pattern, filter_index)
+
+    def filter_rows(self, extracted_data, header, column_names, regex_pattern, filter_index):
         filtered_data = []
         for row in extracted_data:
             if row and len(row) > filter_index and re.match(regex_pattern, str(row[filter_index])):
                 filtered_data.append(row)
 
+        if not column_names:
+            if header is not None:
+                column_names = self.header_column_names(header)
+            else:
+                width = max((len(row) for row in filtered_data), default=0)
+                column_names = [f"Column {idx + 1}" for idx in range(width)]
+
         column_data = {col: [] for col in column_names}
         for row in filtered_data:
             for idx, col in enumerate(column_names):
@@ -357,63 +1463,66 @@ class GridBasedConverter:
 
         return column_data
 
-    def save_to_excel(self, column_data, output_file):
-        df = pd.DataFrame(column_data)
+    def save_to_excel(self, column_data, output_file, timer=None):
+        import pandas as pd
+        timer = timer or StageTimer()
+        with timer.measure("frame"):
+            df = pd.DataFrame(column_data)
         os.makedirs(os.path.dirname(output_file), exist_ok=True)
-        df.to_excel(output_file, index=False)
+        with timer.measure("write"):
+            df.to_excel(output_file, index=False)
 
-    def convert_pdfs_to_excel(self, input_folder, output_folder, column_names, regex_pattern, filter_index):
+    def convert_pdfs_to_excel(self, input_folder, output_folder, column_names, regex_pattern, filter_index, profiler=None):
         pdf_files = [file for file in os.listdir(input_folder) if file.endswith('.pdf')]
+        run_id = run_logger.start_run(converter="grid", input_folder=input_folder, files=len(pdf_files))
+        timer = StageTimer()
 
         if not pdf_files:
-            log_message("No PDF files found in the input folder.")
-            return
-
-        log_message("Processing started.")
+            run_logger.event(run_id, "run_end", files=0, failed=0, message="No PDF files found in the input folder.")
+            return timer
 
+        profiler = profiler or ConversionProfiler(mode=None)
+        profiler.start_run()
+        run_started = time.perf_counter()
+        failed = 0
         for pdf_file in pdf_files:
+            started = time.perf_counter()
+            timer.start_file()
+            profiler.start_file()
+            page_count = None
             try:
                 pdf_path = os.path.join(input_folder, pdf_file)
-                page_count, pdf_obj = self.extract_information(pdf_path)
+                page_count, pdf_obj = self.extract_information(pdf_path, timer)
 
-                log_message(f"Processing {pdf_file} with {page_count} pages.")
-
-                column_data = self.process_pdf(pdf_obj, page_count, column_names, regex_pattern, filter_index)
+                column_data = self.process_pdf(pdf_obj, page_count, column_names, regex_pattern, filter_index, timer)
 
                 output_file = os.path.join(output_folder, f"{os.path.splitext(pdf_file)[0]}.xlsx")
-                self.save_to_excel(column_data, output_file)
-
-                log_message(f"Successfully processed {pdf_file} and saved to {output_file}.")
+                self.save_to_excel(column_data, output_file, timer)
 
                 pdf_obj.close()
+                timer.record("file", time.perf_counter() - started)
+
+                rows = len(next(iter(column_data.values()), []))
+                run_logger.event(run_id, "file_done", file=pdf_file, pages=page_count, rows=rows, output=output_file,
+                                 seconds=round(time.perf_counter() - started, 4), stages=timer.file_stages())
 
             except Exception as e:
-                log_message(f"Failed to process {pdf_file}. Error: {str(e)}")
+                failed += 1
+                run_logger.event(run_id, "file_failed", file=pdf_file, pages=page_count, error=type(e).__name__, message=str(e),
+                                 seconds=round(time.perf_counter() - started, 4), stages=timer.file_stages())
                 continue
+            finally:
+                profiler.end_file(pdf_file)
+
+        profiler.stop_run()
+        run_logger.event(run_id, "run_end", files=len(pdf_files), failed=failed, seconds=round(time.perf_counter() - run_started, 4),
+                         stages=timer.summary())
+        if profiler.mode:
+            profiler.save(output_folder)
+        return timer
 
     def scrape_regex_data(self, search_query):
-        url = f"https://www.regexlib.com/Search.aspx?k={search_query}"
-        response = requests.get(url)
-        soup = BeautifulSoup(response.content, 'html.parser')
-        tables = soup.find_all('table', class_='searchResultsTable')
-
-        data = []
-        for table in tables:
-            table_html = str(table)
-            title_match = re.search(r'<tr class="title".*?<a href="REDetails\.aspx\?regexp_id=\d+">(.*?)</a>', table_html, re.DOTALL)
-            expression_match = re.search(r'<div class="expressionDiv">(.*?)</div>', table_html, re.DOTALL)
-            description_match = re.search(r'<tr class="description".*?<div class="overflowFixDiv">(.*?)</div>', table_html, re.DOTALL)
-            matches_match = re.search(r'<tr class="matches".*?<div class="overflowFixDiv">(.*?)</div>', table_html, re.DOTALL)
-            non_matches_match = re.search(r'<tr class="nonmatches".*?<div class="overflowFixDiv">(.*?)</div>', table_html, re.DOTALL)
-
-            title = title_match.group(1).strip() if title_match else "N/A"
-            expression = expression_match.group(1).strip() if expression_match else "N/A"
-            description = description_match.group(1).strip() if description_match else "N/A"
-            matches = re.sub(r'<.*?>', '', matches_match.group(1)).strip() if matches_match else "N/A"
-            non_matches = re.sub(r'<.*?>', '', non_matches_match.group(1)).strip() if non_matches_match else "N/A"
-
-            data.append([title, expression, description, matches, non_matches])
-        return data
+        return self.regex_search.search(search_query)
 
     def display_regex_results(self):
         search_query = self.search_entry.get().strip()
@@ -421,19 +1530,22 @@ class GridBasedConverter:
             messagebox.showerror("Error", "Please enter a search query.")
             return
 
-        data = self.scrape_regex_data(search_query)
-        for row in self.results_tree.get_children():
-            self.results_tree.delete(row)
-        for item in data:
-            self.results_tree.insert("", "end", values=item)
+        future = self.regex_search.submit(search_query)
+        when_done(self.tab, future, self.show_regex_results)
+
+    def show_regex_results(self, future):
+        try:
+            data = future.result()
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to search regexlib: {e}")
+            return
+
+        self.results_view.set_rows([(None, item) for item in data])
 
     def load_db_regex(self):
         try:
-            df = pd.read_excel("regex_database.xlsx")
-            for row in self.results_tree.get_children():
-                self.results_tree.delete(row)
-            for _, row in df.iterrows():
-                self.results_tree.insert("", "end", values=("", row['Expression'], row['Description'], row['Matches']))
+            rows = regex_database.all_rows()
+            self.results_view.set_rows([(f"db-{row[0]}", row[1:]) for row in rows])
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load db regex: {e}")
 
@@ -444,19 +1556,15 @@ class GridBasedConverter:
             return
 
         try:
-            df = pd.read_excel("regex_database.xlsx")
-            filtered_df = df[df.apply(lambda row: row.astype(str).str.contains(search_query, case=False), axis=1).any(axis=1)]
-            for row in self.results_tree.get_children():
-                self.results_tree.delete(row)
-            for _, row in filtered_df.iterrows():
-                self.results_tree.insert("", "end", values=("", row['Expression'], row['Description'], row['Matches']))
+            rows = regex_database.search(search_query)
+            self.results_view.set_rows([(f"db-{row[0]}", row[1:]) for row in rows])
         except Exception as e:
             messagebox.showerror("Error", f"Failed to search db regex: {e}")
 
     def save_config(self):
         input_folder = self.input_entry.get()
         output_folder = self.output_entry.get()
-        column_names = [col.strip() for col in self.columns_entry.get().split(',')]
+        column_names = [col.strip() for col in self.columns_entry.get().split(',') if col.strip()]
         regex_pattern = self.regex_entry.get()
         try:
             filter_index = int(self.index_entry.get())
@@ -500,7 +1608,7 @@ class GridBasedConverter:
     def start_conversion(self):
         input_folder = self.input_entry.get()
         output_folder = self.output_entry.get()
-        column_names = [col.strip() for col in self.columns_entry.get().split(',')]
+        column_names = [col.strip() for col in self.columns_entry.get().split(',') if col.strip()]
         regex_pattern = self.regex_entry.get()
         try:
             filter_index = int(self.index_entry.get())
@@ -508,26 +1616,391 @@ class GridBasedConverter:
             messagebox.showerror("Error", "Filter index must be an integer.")
             return
 
-        if not input_folder or not output_folder or not column_names or not regex_pattern:
-            messagebox.showerror("Error", "All fields are required.")
+        if not input_folder or not output_folder or not regex_pattern:
+            messagebox.showerror("Error", "Input folder, output folder and regex pattern are required.")
             return
 
         try:
-            self.convert_pdfs_to_excel(input_folder, output_folder, column_names, regex_pattern, filter_index)
-            messagebox.showinfo("Success", "PDFs successfully converted to Excel.")
+            timer = self.convert_pdfs_to_excel(input_folder, output_folder, column_names, regex_pattern, filter_index)
+            messagebox.showinfo("Success", f"PDFs successfully converted to Excel.\n\n{timer.format_summary()}")
         except Exception as e:
             messagebox.showerror("Error", f"An error occurred: {e}")
 
+# ==================== FILE TRANSFERS ====================
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+FICLONE = 0x40049409  # Linux ioctl that shares extents between files (btrfs, XFS, ...)
+CROSS_DEVICE_ERRORS = (errno.EXDEV, errno.EOPNOTSUPP, errno.ENOTTY, errno.EINVAL, errno.ENOSYS, errno.EPERM)
+
+def copy_file_fast(source, destination):
+    # Tries the zero-copy paths first and falls back one step at a time; returns the strategy used.
+    # A failed copy removes what it wrote, so a half-written file is never taken for the transfer.
+    opened = False
+    try:
+        with open(source, 'rb') as src, open(destination, 'wb') as dst:
+            opened = True
+            strategy = None
+            if fcntl is not None and sys.platform.startswith('linux'):
+                try:
+                    fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+                    strategy = "reflink"
+                except OSError:
+                    pass
+
+            if strategy is None and hasattr(os, 'copy_file_range'):
+                try:
+                    size = os.fstat(src.fileno()).st_size
+                    copied = 0
+                    while copied < size:
+                        sent = os.copy_file_range(src.fileno(), dst.fileno(), size - copied)
+                        if sent == 0:
+                            break
+                        copied += sent
+                    # Some filesystems (procfs, some FUSE and NFS mounts) report 0 instead of an error,
+                    # and procfs also reports a size of 0, so only a complete non-empty copy counts
+                    if size and copied == size:
+                        strategy = "copy_file_range"
+                except OSError as e:
+                    if e.errno not in CROSS_DEVICE_ERRORS:
+                        raise
+                if strategy is None:
+                    src.seek(0)
+                    dst.seek(0)
+                    dst.truncate()
+
+        if strategy is None:
+            # shutil already uses sendfile (Linux) or fcopyfile (macOS) internally where it can
+            shutil.copy2(source, destination)
+            return "copy2"
+        shutil.copystat(source, destination)
+        return strategy
+    except Exception:
+        if opened:
+            try:
+                os.remove(destination)
+            except OSError:
+                pass
+        raise
+
+def transfer_file(source, destination, operation, overwrite=False, copy_method="Auto"):
+    # Returns the name of the strategy that did the transfer, for the log
+    if operation == 'Move':
+        try:
+            # Same filesystem: a single atomic rename, no data is copied
+            if overwrite:
+                os.replace(source, destination)
+            else:
+                os.rename(source, destination)
+            return "rename"
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+        if overwrite and os.path.exists(destination):
+            os.remove(destination)  # Remove existing file before moving
+        shutil.move(source, destination)
+        return "copy and delete"
+
+    if overwrite and copy_method != "Full copy" and os.path.exists(destination):
+        os.remove(destination)
+    if copy_method == "Hard link":
+        try:
+            os.link(source, destination)
+            return "hardlink"
+        except OSError as e:
+            if e.errno not in CROSS_DEVICE_ERRORS:
+                raise
+    if copy_method == "Full copy":
+        shutil.copy2(source, destination)  # copy2 will overwrite by default
+        return "copy2"
+    return copy_file_fast(source, destination)
+
+def link_file(source, existing, destination, operation, overwrite=False):
+    # existing already holds the same bytes, so the destination just becomes another name for it
+    if overwrite and os.path.exists(destination):
+        os.remove(destination)
+    os.link(existing, destination)
+    if operation == 'Move':
+        os.remove(source)
+    return f"Linked: {source} → {destination} (same content as {existing})"
+
+def hash_file(path, limit=None, chunk_size=1024 * 1024):
+    digest = hashlib.blake2b()
+    remaining = limit
+    with open(path, 'rb') as file:
+        while remaining is None or remaining > 0:
+            chunk = file.read(chunk_size if remaining is None else min(chunk_size, remaining))
+            if not chunk:
+                break
+            digest.update(chunk)
+            if remaining is not None:
+                remaining -= len(chunk)
+    return digest.hexdigest()
+
+class ContentIndex:
+    # Finds byte-identical files by size, then a hash of the first block, then a full streaming hash.
+    # Each level is only computed once a second file lands in the same bucket, so a file whose size
+    # is unique is never read. Only files that are actually transferred get added, so a match always
+    # stands for content that reaches the destination.
+    def __init__(self, partial_size=64 * 1024):
+        self.partial_size = partial_size
+        self.sizes = {}
+        self.added = {}
+        self.digests = {}
+
+    def digest(self, path, limit=None):
+        key = (path, limit)
+        if key not in self.digests:
+            self.digests[key] = hash_file(path, limit)
+        return self.digests[key]
+
+    def buckets(self, size):
+        # The files of one size, keyed by partial hash; None while no file of that size was added
+        entry = self.sizes.get(size)
+        if entry is not None and not isinstance(entry, dict):
+            entry = self.sizes[size] = {self.digest(entry, self.partial_size): entry}
+        return entry
+
+    def find_duplicate(self, path, size):
+        # Returns an added file with the same content as path, or None
+        entry = self.buckets(size)
+        if entry is None:
+            return None
+        partial = self.digest(path, self.partial_size)
+        bucket = entry.get(partial)
+        if bucket is None or size <= self.partial_size:
+            return bucket  # for small files the partial hash already covered the whole file
+        if not isinstance(bucket, dict):
+            bucket = entry[partial] = {self.digest(bucket): bucket}
+        return bucket.get(self.digest(path))
+
+    def add(self, path, size, hashed_as=None):
+        # hashed_as is a file with the same bytes whose hashes are reused, e.g. the source of a copy
+        if hashed_as is not None:
+            for limit in (self.partial_size, None):
+                if (hashed_as, limit) in self.digests:
+                    self.digests[(path, limit)] = self.digests[(hashed_as, limit)]
+        self.added[path] = size
+        entry = self.buckets(size)
+        if entry is None:
+            self.sizes[size] = path
+            return
+        partial = self.digest(path, self.partial_size)
+        bucket = entry.setdefault(partial, path)
+        if bucket != path and size > self.partial_size:
+            if not isinstance(bucket, dict):
+                bucket = entry[partial] = {self.digest(bucket): bucket}
+            bucket.setdefault(self.digest(path), path)
+
+    def discard(self, path):
+        # For an added file that is overwritten or dropped later in the same run
+        size = self.added.pop(path, None)
+        if size is None:
+            return
+        entry = self.sizes[size]
+        if entry == path:
+            del self.sizes[size]
+        else:
+            partial = self.digests[(path, self.partial_size)]
+            bucket = entry.get(partial)
+            if bucket == path:
+                del entry[partial]
+            elif isinstance(bucket, dict) and bucket.get(self.digests.get((path, None))) == path:
+                del bucket[self.digests[(path, None)]]
+        self.digests.pop((path, self.partial_size), None)
+        self.digests.pop((path, None), None)
+
+def scan_files(folder, min_depth=1, max_depth=None):
+    # Depth-first walk in listing order. Each directory costs one scandir call and DirEntry
+    # caches the file type (and stat once asked), so entries are not stat'ed again. Files directly
+    # in folder are depth 1; symlinked directories are not followed.
+    stack = [(os.scandir(folder), 1)]
+    try:
+        while stack:
+            entries, depth = stack[-1]
+            entry = next(entries, None)
+            if entry is None:
+                entries.close()
+                stack.pop()
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if max_depth is None or depth < max_depth:
+                        stack.append((os.scandir(entry.path), depth + 1))
+                elif depth >= min_depth and entry.is_file():
+                    yield entry
+            except OSError:
+                continue
+    finally:
+        for entries, _ in stack:
+            entries.close()
+
+def parallel_scan(folder, classify, max_workers=8, skip_dirs=()):
+    # Directories are listed and their files stat'ed on a thread pool, which hides the per-call latency
+    # of network shares. classify(path, filename, stat) runs in the workers as well. Yields
+    # (path, filename, result, None) per file and (path, filename, None, error) for anything unreadable.
+    skip_dirs = {os.path.abspath(path) for path in skip_dirs}
+
+    def scan_directory(path):
+        records = []
+        subdirs = []
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir():
+                            if not entry.is_symlink() and os.path.abspath(entry.path) not in skip_dirs:
+                                subdirs.append(entry.path)
+                            continue
+                        records.append((entry.path, entry.name, classify(entry.path, entry.name, entry.stat()), None))
+                    except Exception as e:
+                        records.append((entry.path, entry.name, None, e))
+        except OSError as e:
+            records.append((path, os.path.basename(path), None, e))
+        return records, subdirs
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scan") as executor:
+        pending = {executor.submit(scan_directory, folder)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                records, subdirs = future.result()
+                for subdir in subdirs:
+                    pending.add(executor.submit(scan_directory, subdir))
+                yield from records
+
+def ignores_case(path):
+    # Probes the filesystem: an existing entry that is also found under its case-swapped name. Checks the
+    # nearest existing ancestor whose name has letters; falls back to the platform default.
+    path = os.path.abspath(path)
+    while True:
+        parent, name = os.path.split(path)
+        if name != name.swapcase() and os.path.exists(path):
+            try:
+                return os.path.samefile(path, os.path.join(parent, name.swapcase()))
+            except OSError:
+                return False
+        if parent == path:
+            return sys.platform in ("win32", "darwin")
+        path = parent
+
+class DestinationIndex:
+    # Names taken in each destination folder, read with one scandir the first time the folder is used.
+    # Names are compared case-insensitively only where the folder's filesystem ignores case, so A.pdf and
+    # a.pdf still coexist on a case-sensitive one.
+    def __init__(self):
+        self.folders = {}
+        self.fold_case = {}
+        self.next_suffix = {}
+        self.lock = threading.Lock()
+
+    def key(self, folder, file_name):
+        fold = self.fold_case.get(folder)
+        if fold is None:
+            fold = self.fold_case[folder] = ignores_case(folder)
+        return file_name.lower() if fold else file_name
+
+    def folded(self, path):
+        # Identifies a destination the way the filesystem does, e.g. for dicts keyed by destination
+        folder, file_name = os.path.split(path)
+        with self.lock:
+            return folder, self.key(folder, file_name)
+
+    def names(self, folder):
+        names = self.folders.get(folder)
+        if names is None:
+            try:
+                with os.scandir(folder) as entries:
+                    names = {self.key(folder, entry.name) for entry in entries}
+            except FileNotFoundError:
+                names = set()
+            self.folders[folder] = names
+        return names
+
+    def exists(self, path):
+        folder, file_name = os.path.split(path)
+        with self.lock:
+            return self.key(folder, file_name) in self.names(folder)
+
+    def claim(self, path):
+        folder, file_name = os.path.split(path)
+        with self.lock:
+            self.names(folder).add(self.key(folder, file_name))
+
+    def unique_path(self, path):
+        # The next suffix to try is remembered per name, so the Nth copy of a name does not rescan 1..N
+        folder, file_name = os.path.split(path)
+        with self.lock:
+            names = self.names(folder)
+            if self.key(folder, file_name) not in names:
+                names.add(self.key(folder, file_name))
+                return path
+
+            name, ext = os.path.splitext(file_name)
+            key = (folder, self.key(folder, file_name))
+            counter = self.next_suffix.get(key, 1)
+            while self.key(folder, f"{name}_{counter}{ext}") in names:
+                counter += 1
+            names.add(self.key(folder, f"{name}_{counter}{ext}"))
+            self.next_suffix[key] = counter + 1
+            return os.path.join(folder, f"{name}_{counter}{ext}")
+
+class FileTransferEngine:
+    # Transfers are I/O bound, so a bounded thread pool overlaps them; progress goes out in batches
+    def __init__(self, max_workers=8, batch_size=200):
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+
+    def transfer(self, action, job):
+        try:
+            return True, action(*job)
+        except Exception as e:
+            return False, f"Error processing {job[0]}: {str(e)}"
+
+    def run(self, jobs, action, progress_queue):
+        # Each job is the argument tuple for action, starting with the source path
+        counts = {'processed': 0, 'errors': 0}
+        batch = []
+
+        def collect(futures):
+            for future in futures:
+                ok, message = future.result()
+                counts['processed' if ok else 'errors'] += 1
+                batch.append(message)
+            if len(batch) >= self.batch_size:
+                progress_queue.put(("log", batch[:]))
+                batch.clear()
+
+        pending = set()
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="transfer") as executor:
+            for job in jobs:
+                # Keep only a few transfers queued per worker so huge runs don't hold every future in memory
+                if len(pending) >= self.max_workers * 4:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+                pending.add(executor.submit(self.transfer, action, job))
+            collect(wait(pending)[0])
+
+        if batch:
+            progress_queue.put(("log", batch))
+        return counts['processed'], counts['errors']
+
 # ==================== PROGRAM 3: FLATTEN FOLDER TOOL ====================
 class FlattenFolderTool:
-    def __init__(self, tab):
+    def __init__(self, tab=None, transfer_engine=None):
         self.tab = tab
-        self.setup_ui()
+        self.transfer_engine = transfer_engine or FileTransferEngine()
+        self.progress_queue = queue.Queue()
+        # Without a tab only run_extraction is usable, as the benchmarks use it
+        if tab is not None:
+            self.setup_ui()
     
     def setup_ui(self):
         # Configure grid weights for proper resizing
         self.tab.grid_columnconfigure(1, weight=1)
-        self.tab.grid_rowconfigure(7, weight=1)
+        self.tab.grid_rowconfigure(8, weight=1)
         
         # Input Folder
         ttk.Label(self.tab, text="Source Folder:").grid(row=0, column=0, sticky="w", padx=10, pady=5)
@@ -544,8 +2017,13 @@ class FlattenFolderTool:
         # Operation Type (Move/Copy)
         ttk.Label(self.tab, text="Operation:").grid(row=2, column=0, sticky="w", padx=10, pady=5)
         self.operation_var = tk.StringVar(value="Move")
-        operation_menu = ttk.Combobox(self.tab, textvariable=self.operation_var, values=["Move", "Copy"], state="readonly", width=47)
-        operation_menu.grid(row=2, column=1, padx=10, pady=5, sticky="w")
+        operation_frame = ttk.Frame(self.tab)
+        operation_frame.grid(row=2, column=1, padx=10, pady=5, sticky="w")
+        ttk.Combobox(operation_frame, textvariable=self.operation_var, values=["Move", "Copy"], state="readonly", width=20).pack(side="left")
+        ttk.Label(operation_frame, text="Copy method:").pack(side="left", padx=(20, 5))
+        self.copy_method_var = tk.StringVar(value="Auto")
+        ttk.Combobox(operation_frame, textvariable=self.copy_method_var, values=["Auto", "Full copy", "Hard link"],
+                     state="readonly", width=10).pack(side="left")
         
         # File Extensions
         ttk.Label(self.tab, text="File Extensions (comma-separated):").grid(row=3, column=0, sticky="w", padx=10, pady=5)
@@ -565,30 +2043,59 @@ class FlattenFolderTool:
         ttk.Radiobutton(duplicates_frame, text="Rename", variable=self.duplicates_var, value="rename").pack(side="left")
         ttk.Radiobutton(duplicates_frame, text="Overwrite", variable=self.duplicates_var, value="overwrite").pack(side="left", padx=10)
         ttk.Radiobutton(duplicates_frame, text="Skip", variable=self.duplicates_var, value="skip").pack(side="left")
-        
+        ttk.Label(duplicates_frame, text="Identical files:").pack(side="left", padx=(20, 5))
+        self.identical_var = tk.StringVar(value="Transfer")
+        ttk.Combobox(duplicates_frame, textvariable=self.identical_var, values=["Transfer", "Skip", "Hard link"],
+                     state="readonly", width=10).pack(side="left")
+        
+        # Folder Depth
+        ttk.Label(self.tab, text="Folder Depth:").grid(row=5, column=0, sticky="w", padx=10, pady=5)
+        depth_frame = ttk.Frame(self.tab)
+        depth_frame.grid(row=5, column=1, sticky="w", padx=10, pady=5)
+        self.recursive_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(depth_frame, text="Recursive", variable=self.recursive_var).pack(side="left")
+        ttk.Label(depth_frame, text="Max depth (0 = unlimited):").pack(side="left", padx=(10, 5))
+        self.max_depth_var = tk.StringVar(value="0")
+        ttk.Spinbox(depth_frame, from_=0, to=999, textvariable=self.max_depth_var, width=5).pack(side="left")
+
         # Execute Button
-        ttk.Button(self.tab, text="Extract Files", command=self.extract_files, width=20).grid(row=5, column=1, pady=10)
+        self.extract_button = ttk.Button(self.tab, text="Extract Files", command=self.extract_files, width=20)
+        self.extract_button.grid(row=6, column=1, pady=10)
 
         # Log Area
-        ttk.Label(self.tab, text="Operation Log:").grid(row=6, column=0, sticky="nw", padx=10, pady=5)
+        ttk.Label(self.tab, text="Operation Log:").grid(row=7, column=0, sticky="nw", padx=10, pady=5)
         
         # Create a frame for the log text with integrated scrollbar
         log_frame = ttk.Frame(self.tab)
-        log_frame.grid(row=7, column=0, columnspan=3, padx=10, pady=5, sticky="nsew")
+        log_frame.grid(row=8, column=0, columnspan=3, padx=10, pady=5, sticky="nsew")
         log_frame.grid_columnconfigure(0, weight=1)
         log_frame.grid_rowconfigure(0, weight=1)
         
         # Create Text widget with integrated scrollbar
         self.log_text = scrolledtext.ScrolledText(log_frame, wrap=tk.WORD)
         self.log_text.grid(row=0, column=0, sticky="nsew")
+        self.log_sink = LogSink(self.log_text, log_file="flatten_log.txt")
     
     def extract_files(self):
         source_folder = self.input_entry.get()
         destination_folder = self.output_entry.get()
         operation = self.operation_var.get()  # 'Move' or 'Copy'
+        copy_method = self.copy_method_var.get()  # 'Auto', 'Full copy' or 'Hard link'
         extensions = self.extensions_entry.get().strip()
         all_extensions = self.all_extensions_var.get()  # Boolean
         handle_duplicates = self.duplicates_var.get()  # 'keep', 'overwrite', or 'rename'
+        identical = self.identical_var.get()  # 'Transfer', 'Skip' or 'Hard link'
+        try:
+            max_depth = int(self.max_depth_var.get())
+        except ValueError:
+            messagebox.showerror("Error", "Max depth must be a whole number")
+            return
+
+        # Recursive mode takes files from every level up to max depth; otherwise only the two levels below each top folder
+        if self.recursive_var.get():
+            depth_range = (1, max_depth or None)
+        else:
+            depth_range = (2, 3)
         
         # Validate inputs
         if not source_folder or not destination_folder:
@@ -612,122 +2119,389 @@ class FlattenFolderTool:
                 return
         
         # Clear the log
-        self.log_text.delete(1.0, tk.END)
-        self.log_text.insert(tk.END, f"Starting {operation.lower()} operation...\n")
-        self.log_text.insert(tk.END, f"Duplicate handling: {handle_duplicates}\n")
-        self.log_text.see(tk.END)
-        self.tab.update()
-        
+        self.log_sink.clear()
+        self.log_sink.write(f"Starting {operation.lower()} operation...")
+        self.log_sink.write(f"Duplicate handling: {handle_duplicates}")
+        self.log_sink.write(f"Identical files: {identical}")
+
+        # The scan and the transfers run off the Tk thread; poll_progress picks up their batches
+        self.extract_button.configure(state="disabled")
+        threading.Thread(target=self.run_extraction, daemon=True,
+                         args=(source_folder, destination_folder, operation, extensions, handle_duplicates, depth_range, identical,
+                               copy_method)).start()
+        self.tab.after(100, self.poll_progress)
+
+    def collect_files(self, source_folder, extensions, min_depth=2, max_depth=3, destination_folder=None):
+        # Files already sitting in the destination (when it lives inside the source) are left alone
+        destination_folder = os.path.abspath(destination_folder) if destination_folder else None
+        return [entry for entry in scan_files(source_folder, min_depth, max_depth)
+                if (extensions is None or os.path.splitext(entry.name)[1].lower() in extensions)
+                and os.path.dirname(os.path.abspath(entry.path)) != destination_folder]
+
+    def plan_transfers(self, files, destination_folder, handle_duplicates, identical="Transfer"):
+        # Destinations are decided up front in scan order, so concurrent transfers never race for a name
+        transfers = []
+        skipped = []
+        claimed = {}
+        destination_index = DestinationIndex()
+        content_index = ContentIndex() if identical != "Transfer" else None
+        for entry in files:
+            file_path, file_name = entry.path, entry.name
+            original = None
+            if content_index is not None:
+                original = content_index.find_duplicate(file_path, entry.stat().st_size)
+                if original is not None and identical == "Skip":
+                    skipped.append(f"Skipped identical: {file_path} (same content as {original})")
+                    continue
+
+            dest_path = os.path.join(destination_folder, file_name)
+
+            if destination_index.exists(dest_path):
+                if handle_duplicates == 'skip':
+                    skipped.append(f"Skipped duplicate: {file_path}")
+                    continue
+                elif handle_duplicates == 'overwrite':
+                    earlier = claimed.get(destination_index.folded(dest_path))
+                    if earlier is not None:
+                        # A later file with the same name wins, as it would have when copied one by one. It takes
+                        # over the planned path, so two workers never write one file under differently cased names.
+                        dest_path = transfers[earlier][1]
+                        skipped.append(f"Skipped duplicate: {transfers[earlier][0]}")
+                        if content_index is not None:
+                            content_index.discard(transfers[earlier][0])
+                        transfers[earlier] = None
+                elif handle_duplicates == 'rename':
+                    dest_path = destination_index.unique_path(dest_path)
+
+            destination_index.claim(dest_path)
+            claimed[destination_index.folded(dest_path)] = len(transfers)
+            transfers.append((file_path, dest_path, handle_duplicates == 'overwrite', original))
+            if content_index is not None and original is None:
+                content_index.add(file_path, entry.stat().st_size)
+
+        # Identical files become hard links to wherever their first copy lands. If that copy is not
+        # transferred after all (skipped or overwritten by name), the next identical file stands in for it.
+        copies = []
+        links = []
+        landed = {}
+        for transfer in transfers:
+            if transfer is None:
+                continue
+            file_path, dest_path, overwrite, original = transfer
+            if original is not None and original in landed:
+                links.append((file_path, landed[original], dest_path, overwrite))
+                continue
+            copies.append((file_path, dest_path, overwrite))
+            landed[file_path] = dest_path
+            if original is not None:
+                landed[original] = dest_path
+        return copies, links, skipped
+
+    def transfer(self, source, destination, operation, overwrite, copy_method):
+        strategy = transfer_file(source, destination, operation, overwrite, copy_method)
+        return f"{'Moved' if operation == 'Move' else 'Copied'} ({strategy}): {source} → {destination}"
+
+    def run_extraction(self, source_folder, destination_folder, operation, extensions, handle_duplicates, depth_range=(2, 3),
+                       identical="Transfer", copy_method="Auto"):
         try:
-            processed_files = 0
-            skipped_files = 0
+            files = self.collect_files(source_folder, extensions, *depth_range, destination_folder=destination_folder)
+            transfers, links, skipped = self.plan_transfers(files, destination_folder, handle_duplicates, identical)
+            if skipped:
+                self.progress_queue.put(("log", skipped))
+            processed_files, _ = self.transfer_engine.run(
+                transfers, lambda source, destination, overwrite: self.transfer(source, destination, operation, overwrite, copy_method),
+                self.progress_queue)
+            # Links go last, once the files they point at are in place
+            linked_files, _ = self.transfer_engine.run(
+                links, lambda source, existing, destination, overwrite: link_file(source, existing, destination, operation, overwrite),
+                self.progress_queue)
+            processed_files += linked_files
+            self.progress_queue.put(("done", processed_files, len(skipped)))
+        except Exception as e:
+            self.progress_queue.put(("error", str(e)))
+
+    def poll_progress(self):
+        finished = None
+        while True:
+            try:
+                event = self.progress_queue.get_nowait()
+            except queue.Empty:
+                break
+            if event[0] == "log":
+                for line in event[1]:
+                    self.log_sink.write(line)
+            else:
+                finished = event
+
+        if finished is None:
+            self.tab.after(100, self.poll_progress)
+            return
+
+        self.extract_button.configure(state="normal")
+        if finished[0] == "done":
+            processed_files, skipped_files = finished[1], finished[2]
+            self.log_sink.write(f"\nOperation completed!")
+            self.log_sink.write(f"Files processed: {processed_files}")
+            self.log_sink.write(f"Files skipped: {skipped_files}")
+            self.log_sink.flush()
+            messagebox.showinfo("Success", f"Operation completed!\nProcessed: {processed_files} files\nSkipped: {skipped_files} files")
+        else:
+            self.log_sink.write(f"\nError: {finished[1]}")
+            self.log_sink.flush()
+            messagebox.showerror("Error", f"An error occurred: {finished[1]}")
+
+# ==================== ORGANIZATION PLAN ====================
+class OrganizationPlan:
+    # Everything one scan decided, as (source, destination, action, size, link target) entries.
+    # Preview renders it, Execute runs it, and it round-trips through JSON for the command line.
+    def __init__(self, source_folder, destination_folder, operation, copy_method="Auto", overwrite=False, settings=None):
+        self.source_folder = source_folder
+        self.destination_folder = destination_folder
+        self.operation = operation
+        self.copy_method = copy_method
+        self.overwrite = overwrite
+        self.settings = settings
+        self.entries = []
+        self.unmatched = 0
+        self.errors = []
+
+    def add(self, source, destination, action, size, target=None):
+        self.entries.append((source, destination, action, size, target))
+
+    def transfers(self):
+        return [entry for entry in self.entries if not entry[2].startswith("Skip")]
+
+    def to_dict(self):
+        return {
+            'source_folder': self.source_folder,
+            'destination_folder': self.destination_folder,
+            'operation': self.operation,
+            'copy_method': self.copy_method,
+            'overwrite': self.overwrite,
+            'settings': self.settings,
+            'entries': [list(entry) for entry in self.entries],
+            'unmatched': self.unmatched,
+            'errors': self.errors,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        plan = cls(data['source_folder'], data['destination_folder'], data['operation'],
+                   data.get('copy_method', "Auto"), data.get('overwrite', False), data.get('settings'))
+        plan.entries = [tuple(entry) for entry in data.get('entries', [])]
+        plan.unmatched = data.get('unmatched', 0)
+        plan.errors = data.get('errors', [])
+        return plan
+
+    def save(self, file_path):
+        with open(file_path, 'w') as file:
+            json.dump(self.to_dict(), file, indent=1)
+
+    @classmethod
+    def load(cls, file_path):
+        with open(file_path, 'r') as file:
+            return cls.from_dict(json.load(file))
+
+def execute_plan(plan, log):
+    processed = 0
+    skipped = plan.unmatched
+    errors = len(plan.errors)
+    created_folders = set()
+
+    for source, destination, action, size, target in plan.entries:
+        filename = os.path.basename(source)
+        if action == "Skip identical":
+            log(f"Skipped identical: {filename} (same content as {os.path.basename(target)})")
+            skipped += 1
+            continue
+        if action == "Skip duplicate":
+            log(f"Skipped duplicate: {filename}")
+            skipped += 1
+            continue
+
+        try:
+            # Ensure destination folder exists
+            dest_folder = os.path.dirname(destination)
+            if dest_folder not in created_folders:
+                os.makedirs(dest_folder, exist_ok=True)
+                created_folders.add(dest_folder)
+
+            if action == "Link":
+                link_file(source, target, destination, plan.operation, overwrite=plan.overwrite)
+                label = "Linked"
+            else:
+                strategy = transfer_file(source, destination, plan.operation, overwrite=plan.overwrite, copy_method=plan.copy_method)
+                label = f"{'Moved' if plan.operation == 'Move' else 'Copied'} ({strategy})"
+            log(f"{label}: {filename} → {dest_folder}")
+            processed += 1
+        except Exception as e:
+            log(f"Error processing {filename}: {str(e)}")
+            errors += 1
+
+    return processed, skipped, errors
+
+# ==================== ORGANIZER RULES ====================
+# Snapshot of the organizer's inputs, parsed once per run. classify_file only reads it, so it is safe
+# to call from worker threads.
+OrganizerRules = namedtuple("OrganizerRules", [
+    "mode", "base_folder",
+    "extensions", "misc_folder",
+    "size_operator", "size_bytes", "size_folder",
+    "date_criteria", "date_from", "date_to", "date_folder", "grouping",
+    "name_position", "name_text", "name_folder",
+])
+
+SIZE_OPERATORS = {
+    "<": lambda size, target: size < target,
+    "<=": lambda size, target: size <= target,
+    "=": lambda size, target: size == target,
+    ">=": lambda size, target: size >= target,
+    ">": lambda size, target: size > target,
+}
+
+DATE_CRITERIA = {
+    "Created on": lambda date, start, end: date == start,
+    "Created after": lambda date, start, end: date > start,
+    "Created before": lambda date, start, end: date < start,
+    "Between dates": lambda date, start, end: start <= date <= end,
+}
+
+def classify_file(rules, filename, size_bytes, ctime):
+    if not rules.base_folder:
+        return None
+
+    if rules.mode == "By Extension":
+        if rules.extensions is None:
+            return rules.base_folder
+        name, ext = os.path.splitext(filename)
+        ext = ext.lower()[1:] if ext else "no_extension"
+        if ext in rules.extensions:
+            return os.path.join(rules.base_folder, f"{ext} files")
+        return rules.misc_folder
+
+    elif rules.mode == "By Size":
+        if rules.size_bytes is None:
+            return rules.size_folder
+        if not SIZE_OPERATORS[rules.size_operator](size_bytes, rules.size_bytes):
+            return None
+        return rules.size_folder
+
+    elif rules.mode == "By Date":
+        if rules.date_from is None:
+            return None
+        date_created = datetime.fromtimestamp(ctime)
+        if not DATE_CRITERIA[rules.date_criteria](date_created.date(), rules.date_from, rules.date_to):
+            return None
+
+        if rules.grouping == "Single folder":
+            return rules.date_folder
+        elif rules.grouping == "Year":
+            return os.path.join(rules.base_folder, str(date_created.year))
+        elif rules.grouping in ("Month", "Year-Month"):
+            return os.path.join(rules.base_folder, date_created.strftime("%Y-%m"))
+        elif rules.grouping == "Day":
+            return os.path.join(rules.base_folder, date_created.strftime("%Y-%m-%d"))
+
+    elif rules.mode == "By Name":
+        if rules.name_folder is None:
+            return None
+        filename_lower = filename.lower()
+        if rules.name_position == "Anywhere" and rules.name_text not in filename_lower:
+            return None
+        elif rules.name_position == "Starts with" and not filename_lower.startswith(rules.name_text):
+            return None
+        elif rules.name_position == "Ends with" and not filename_lower.endswith(rules.name_text):
+            return None
+        return rules.name_folder
+
+    return None
+
+def resolve_destination(destination_index, dest_path, duplicates):
+    # The path a file is transferred to, or None when it is skipped as a duplicate name
+    if not destination_index.exists(dest_path):
+        destination_index.claim(dest_path)
+        return dest_path
+    if duplicates == "overwrite":
+        return dest_path
+    elif duplicates == "skip":
+        return None
+    # Default is "rename"
+    return destination_index.unique_path(dest_path)
+
+def plan_organization(source_folder, rules, operation, copy_method="Auto", duplicates="rename", identical="Transfer", settings=None):
+    # One scan of source_folder into an OrganizationPlan; the File Organizer tab and the benchmarks both plan with it
+    plan = OrganizationPlan(source_folder, rules.base_folder, operation, copy_method, duplicates == "overwrite", settings)
+    destination_index = DestinationIndex()
+    content_index = ContentIndex() if identical != "Transfer" else None
+    # Planned transfers as source -> destination and back. The sources are all still in place while
+    # the plan is built, so the index can hash them.
+    landed = {}
+    sources = {}
+
+    # When the destination lies inside the source its contents are earlier output, not input
+    source_abs = os.path.abspath(source_folder)
+    dest_abs = os.path.abspath(plan.destination_folder) if plan.destination_folder else None
+    skip_dirs = [dest_abs] if dest_abs and dest_abs.startswith(source_abs + os.sep) else []
+
+    def classify(file_path, filename, file_stat):
+        return file_stat, classify_file(rules, filename, file_stat.st_size, file_stat.st_ctime)
+
+    candidates = []
+    for file_path, filename, result, error in parallel_scan(source_folder, classify, skip_dirs=skip_dirs):
+        if error is not None:
+            plan.errors.append(f"Error processing {filename}: {str(error)}")
+            continue
+        file_stat, dest_folder = result
+        # Files already sitting in their destination folder are left where they are
+        if not dest_folder or os.path.dirname(os.path.abspath(file_path)) == os.path.abspath(dest_folder):
+            plan.unmatched += 1
+            continue
+        candidates.append((file_path, filename, file_stat, dest_folder))
+
+    # The scan finishes in whatever order the workers do; names are handed out in path order
+    candidates.sort()
+    for file_path, filename, file_stat, dest_folder in candidates:
+        try:
+            dest_path = os.path.join(dest_folder, filename)
             
-            # Iterate through each secondary folder in the main folder
-            for secondary_folder in os.listdir(source_folder):
-                secondary_folder_path = os.path.join(source_folder, secondary_folder)
-                
-                # Check if the item is a directory
-                if os.path.isdir(secondary_folder_path):
-                    
-                    # Iterate through the items within each secondary folder
-                    for item in os.listdir(secondary_folder_path):
-                        item_path = os.path.join(secondary_folder_path, item)
-                        
-                        # Check if the item is a directory or a file
-                        if os.path.isdir(item_path):
-                            # Iterate through the files in each subfolder
-                            for file_name in os.listdir(item_path):
-                                file_path = os.path.join(item_path, file_name)
-                                
-                                # Check extension if needed
-                                if extensions is None or os.path.splitext(file_name)[1].lower() in extensions:
-                                    dest_path = os.path.join(destination_folder, file_name)
-                                    
-                                    # Handle duplicates based on user selection
-                                    if os.path.exists(dest_path):
-                                        if handle_duplicates == 'skip':
-                                            self.log_text.insert(tk.END, f"Skipped duplicate: {file_path}\n")
-                                            skipped_files += 1
-                                            continue
-                                        elif handle_duplicates == 'overwrite':
-                                            if operation == 'Move':
-                                                os.remove(dest_path)  # Remove existing file before moving
-                                            else:
-                                                pass  # copy2 will overwrite by default
-                                        elif handle_duplicates == 'rename':
-                                            counter = 1
-                                            name, ext = os.path.splitext(file_name)
-                                            while os.path.exists(dest_path):
-                                                dest_path = os.path.join(destination_folder, f"{name}_{counter}{ext}")
-                                                counter += 1
-                                    
-                                    # Perform the operation
-                                    try:
-                                        if operation == 'Move':
-                                            shutil.move(file_path, dest_path)
-                                            self.log_text.insert(tk.END, f"Moved: {file_path} → {dest_path}\n")
-                                        else:
-                                            shutil.copy2(file_path, dest_path)
-                                            self.log_text.insert(tk.END, f"Copied: {file_path} → {dest_path}\n")
-                                        processed_files += 1
-                                    except Exception as e:
-                                        self.log_text.insert(tk.END, f"Error processing {file_path}: {str(e)}\n")
-                                    
-                                    self.log_text.see(tk.END)
-                                    self.tab.update()
-                        else:
-                            # If it's a file, check extension if needed
-                            if extensions is None or os.path.splitext(item)[1].lower() in extensions:
-                                dest_path = os.path.join(destination_folder, item)
-                                
-                                # Handle duplicates based on user selection
-                                if os.path.exists(dest_path):
-                                    if handle_duplicates == 'skip':
-                                        self.log_text.insert(tk.END, f"Skipped duplicate: {item_path}\n")
-                                        skipped_files += 1
-                                        continue
-                                    elif handle_duplicates == 'overwrite':
-                                        if operation == 'Move':
-                                            os.remove(dest_path)  # Remove existing file before moving
-                                        else:
-                                            pass  # copy2 will overwrite by default
-                                    elif handle_duplicates == 'rename':
-                                        counter = 1
-                                        name, ext = os.path.splitext(item)
-                                        while os.path.exists(dest_path):
-                                            dest_path = os.path.join(destination_folder, f"{name}_{counter}{ext}")
-                                            counter += 1
-                                
-                                # Perform the operation
-                                try:
-                                    if operation == 'Move':
-                                        shutil.move(item_path, dest_path)
-                                        self.log_text.insert(tk.END, f"Moved: {item_path} → {dest_path}\n")
-                                    else:
-                                        shutil.copy2(item_path, dest_path)
-                                        self.log_text.insert(tk.END, f"Copied: {item_path} → {dest_path}\n")
-                                    processed_files += 1
-                                except Exception as e:
-                                    self.log_text.insert(tk.END, f"Error processing {item_path}: {str(e)}\n")
-                                
-                                self.log_text.see(tk.END)
-                                self.tab.update()
+            # Files with the same bytes as one already planned for transfer are skipped or hard-linked to it
+            original = content_index.find_duplicate(file_path, file_stat.st_size) if content_index else None
+            if original is not None and identical == "Skip":
+                plan.add(file_path, dest_path, "Skip identical", file_stat.st_size, original)
+                continue
             
-            self.log_text.insert(tk.END, f"\nOperation completed!\n")
-            self.log_text.insert(tk.END, f"Files processed: {processed_files}\n")
-            self.log_text.insert(tk.END, f"Files skipped: {skipped_files}\n")
-            messagebox.showinfo("Success", f"Operation completed!\nProcessed: {processed_files} files\nSkipped: {skipped_files} files")
+            # Handle duplicates
+            final_dest_path = resolve_destination(destination_index, dest_path, duplicates)
+            if not final_dest_path:
+                plan.add(file_path, dest_path, "Skip duplicate", file_stat.st_size)
+                continue
+            
+            target = landed.get(original)
+            if target is not None and destination_index.folded(target) == destination_index.folded(final_dest_path):
+                target = None  # the same bytes already go to this very name
+            elif destination_index.folded(final_dest_path) in sources:
+                # Overwritten later in the run, so that file no longer stands for its content
+                content_index.discard(sources.pop(destination_index.folded(final_dest_path)))
+            
+            if target is not None:
+                plan.add(file_path, final_dest_path, "Link", file_stat.st_size, target)
+            else:
+                plan.add(file_path, final_dest_path, plan.operation, file_stat.st_size)
+            if content_index is not None and original is None:
+                content_index.add(file_path, file_stat.st_size)
+                landed[file_path] = final_dest_path
+                sources[destination_index.folded(final_dest_path)] = file_path
         except Exception as e:
-            self.log_text.insert(tk.END, f"\nError: {str(e)}\n")
-            messagebox.showerror("Error", f"An error occurred: {str(e)}")
-        finally:
-            self.log_text.see(tk.END)
+            plan.errors.append(f"Error processing {filename}: {str(e)}")
+    return plan
 
 # ==================== PROGRAM 4: FILE ORGANIZER ====================
 class FileOrganizerTool:
     def __init__(self, tab):
         self.tab = tab
         self.calendar_windows = []
+        self.plan = None
+        self.plan_from_file = False
         self.setup_ui()
     
     def setup_ui(self):
@@ -745,16 +2519,13 @@ class FileOrganizerTool:
         self.date_tab = ttk.Frame(self.org_notebook)
         self.name_tab = ttk.Frame(self.org_notebook)
 
-        self.org_notebook.add(self.extension_tab, text="By Extension")
-        self.org_notebook.add(self.size_tab, text="By Size")
-        self.org_notebook.add(self.date_tab, text="By Date")
-        self.org_notebook.add(self.name_tab, text="By Name")
-
-        # Setup tab-specific UIs
-        self.setup_extension_tab()
-        self.setup_size_tab()
-        self.setup_date_tab()
-        self.setup_name_tab()
+        # Tab-specific UIs are set up when the tab is first selected
+        self.org_tabs = LazyNotebook(self.org_notebook)
+        self.org_tabs.add(self.extension_tab, "By Extension", self.setup_extension_tab)
+        self.org_tabs.add(self.size_tab, "By Size", self.setup_size_tab)
+        self.org_tabs.add(self.date_tab, "By Date", self.setup_date_tab)
+        self.org_tabs.add(self.name_tab, "By Name", self.setup_name_tab)
+        self.org_tabs.build_selected()
         
         # Common widgets for all tabs
         self.setup_common_widgets()
@@ -769,8 +2540,14 @@ class FileOrganizerTool:
         # Operation Type
         ttk.Label(self.tab, text="Operation:").grid(row=2, column=0, sticky="w", padx=10, pady=5)
         self.operation_var = tk.StringVar(value="Copy")
-        ttk.Combobox(self.tab, textvariable=self.operation_var, 
-                    values=["Copy", "Move"], state="readonly").grid(row=2, column=1, padx=10, pady=5, sticky="w")
+        operation_frame = ttk.Frame(self.tab)
+        operation_frame.grid(row=2, column=1, padx=10, pady=5, sticky="w")
+        ttk.Combobox(operation_frame, textvariable=self.operation_var, 
+                    values=["Copy", "Move"], state="readonly").pack(side="left")
+        ttk.Label(operation_frame, text="Copy method:").pack(side="left", padx=(20, 5))
+        self.copy_method_var = tk.StringVar(value="Auto")
+        ttk.Combobox(operation_frame, textvariable=self.copy_method_var, values=["Auto", "Full copy", "Hard link"],
+                     state="readonly", width=10).pack(side="left")
         
         # Destination Folder
         ttk.Label(self.tab, text="Destination Folder:").grid(row=3, column=0, sticky="w", padx=10, pady=5)
@@ -786,12 +2563,18 @@ class FileOrganizerTool:
         ttk.Radiobutton(duplicates_frame, text="Rename", variable=self.duplicates_var, value="rename").pack(side="left")
         ttk.Radiobutton(duplicates_frame, text="Overwrite", variable=self.duplicates_var, value="overwrite").pack(side="left", padx=10)
         ttk.Radiobutton(duplicates_frame, text="Skip", variable=self.duplicates_var, value="skip").pack(side="left")
+        ttk.Label(duplicates_frame, text="Identical files:").pack(side="left", padx=(20, 5))
+        self.identical_var = tk.StringVar(value="Transfer")
+        ttk.Combobox(duplicates_frame, textvariable=self.identical_var, values=["Transfer", "Skip", "Hard link"],
+                     state="readonly", width=10).pack(side="left")
         
         # Action Buttons
         btn_frame = ttk.Frame(self.tab)
         btn_frame.grid(row=5, column=0, columnspan=3, pady=10)
         ttk.Button(btn_frame, text="Preview", command=self.preview_organization).pack(side="left", padx=10)
         ttk.Button(btn_frame, text="Execute", command=self.execute_organization).pack(side="left", padx=10)
+        ttk.Button(btn_frame, text="Save Plan", command=self.save_plan).pack(side="left", padx=10)
+        ttk.Button(btn_frame, text="Load Plan", command=self.load_plan).pack(side="left", padx=10)
         
         # Log Area
         ttk.Label(self.tab, text="Operation Log:").grid(row=6, column=0, sticky="nw", padx=10, pady=5)
@@ -803,6 +2586,8 @@ class FileOrganizerTool:
         
         self.log_text = scrolledtext.ScrolledText(log_frame, wrap=tk.WORD, height=15)
         self.log_text.grid(row=0, column=0, sticky="nsew")
+        self.log_sink = LogSink(self.log_text, log_file="organizer_log.txt")
+        self.last_update = 0
         
         # Status Bar
         self.status_var = tk.StringVar()
@@ -938,6 +2723,7 @@ class FileOrganizerTool:
             self.custom_name_pattern.grid_remove()
     
     def show_calendar(self, entry_widget):
+        from tkcalendar import Calendar
         top = tk.Toplevel(self.tab)
         self.calendar_windows.append(top)
         top.title("Select Date")
@@ -960,12 +2746,16 @@ class FileOrganizerTool:
             entry_widget.insert(0, folder_path)
     
     def log_message(self, message):
-        self.log_text.insert(tk.END, message + "\n")
-        self.log_text.see(tk.END)
-        self.tab.update()
+        self.log_sink.write(message)
+        # Preview and execute run on the Tk thread, so let the window repaint now and then
+        now = time.monotonic()
+        if now - self.last_update >= self.log_sink.interval / 1000:
+            self.last_update = now
+            self.log_sink.flush()
+            self.tab.update()
     
     def clear_log(self):
-        self.log_text.delete(1.0, tk.END)
+        self.log_sink.clear()
     
     def validate_date(self, date_str):
         try:
@@ -986,202 +2776,107 @@ class FileOrganizerTool:
         except ValueError:
             return None
     
-    def get_destination_folder(self, file_path, file_stat):
+    def compile_rules(self):
         base_folder = self.dest_entry.get()
-        if not base_folder:
-            return None
-            
-        filename = os.path.basename(file_path)
-        name, ext = os.path.splitext(filename)
-        ext = ext.lower()[1:] if ext else "no_extension"
-        size_bytes = file_stat.st_size
-        date_created = datetime.fromtimestamp(file_stat.st_ctime)
-        
-        current_tab = self.org_notebook.tab(self.org_notebook.select(), "text")
-        
-        if current_tab == "By Extension":
-            if not self.extensions_entry.get().strip():
-                return base_folder
-                
-            specified_exts = [e.strip().lower() for e in self.extensions_entry.get().split(",")]
-            if ext in specified_exts:
-                return os.path.join(base_folder, f"{ext} files")
-            elif self.misc_var.get():
-                return os.path.join(base_folder, "Miscellaneous extension files")
-            return None
-        
-        elif current_tab == "By Size":
+        mode = self.org_notebook.tab(self.org_notebook.select(), "text")
+        values = dict.fromkeys(OrganizerRules._fields)
+        values.update(mode=mode, base_folder=base_folder)
+
+        if mode == "By Extension":
+            extensions_text = self.extensions_entry.get().strip()
+            if extensions_text:
+                values['extensions'] = frozenset(e.strip().lower() for e in extensions_text.split(",") if e.strip())
+                if self.misc_var.get():
+                    values['misc_folder'] = os.path.join(base_folder, "Miscellaneous extension files")
+
+        elif mode == "By Size":
             size_value = self.size_value.get().strip()
             if not size_value:
-                return base_folder
-                
-            target_size = self.get_size_in_bytes(size_value, self.size_unit.get())
-            if target_size is None:
-                return None
-                
-            operator = self.size_operator.get()
-            file_size = size_bytes
-            
-            # Check if file matches size criteria
-            if operator == "<" and not (file_size < target_size):
-                return None
-            elif operator == "<=" and not (file_size <= target_size):
-                return None
-            elif operator == "=" and not (file_size == target_size):
-                return None
-            elif operator == ">=" and not (file_size >= target_size):
-                return None
-            elif operator == ">" and not (file_size > target_size):
-                return None
-                
-            # Create folder name based on pattern
-            pattern = self.size_folder_pattern.get()
-            folder_name = pattern.format(
-                operator=self.size_operator.get(),
-                value=self.size_value.get(),
-                unit=self.size_unit.get()
-            )
-            return os.path.join(base_folder, folder_name)
-        
-        elif current_tab == "By Date":
+                # No size given: everything goes straight into the destination folder
+                values['size_folder'] = base_folder
+            else:
+                target_size = self.get_size_in_bytes(size_value, self.size_unit.get())
+                if target_size is not None:
+                    folder_name = self.size_folder_pattern.get().format(
+                        operator=self.size_operator.get(),
+                        value=self.size_value.get(),
+                        unit=self.size_unit.get()
+                    )
+                    values.update(size_operator=self.size_operator.get(), size_bytes=target_size,
+                                  size_folder=os.path.join(base_folder, folder_name))
+
+        elif mode == "By Date":
             date_criteria = self.date_criteria.get()
-            grouping = self.date_grouping.get()
-            
-            # Check date criteria
-            if date_criteria == "Created on":
-                date_str = self.date_entry.get().strip()
-                if not date_str:
-                    return None
-                    
-                target_date = self.validate_date(date_str)
-                if not target_date or date_created.date() != target_date:
-                    return None
-                    
-                if grouping == "Single folder":
-                    return os.path.join(base_folder, f"Created on {date_str}")
-                elif grouping == "Year":
-                    return os.path.join(base_folder, str(date_created.year))
-                elif grouping == "Month":
-                    return os.path.join(base_folder, date_created.strftime("%Y-%m"))
-                elif grouping == "Day":
-                    return os.path.join(base_folder, date_created.strftime("%Y-%m-%d"))
-                elif grouping == "Year-Month":
-                    return os.path.join(base_folder, date_created.strftime("%Y-%m"))
-                
-            
-            elif date_criteria == "Created after":
-                date_str = self.date_entry.get().strip()
-                if not date_str:
-                    return None
-                    
-                target_date = self.validate_date(date_str)
-                if not target_date or date_created.date() <= target_date:
-                    return None
-                    
-                if grouping == "Single folder":
-                    return os.path.join(base_folder, f"Created after {date_str}")
-                elif grouping == "Year":
-                    return os.path.join(base_folder, str(date_created.year))
-                elif grouping == "Month":
-                    return os.path.join(base_folder, date_created.strftime("%Y-%m"))
-                elif grouping == "Day":
-                    return os.path.join(base_folder, date_created.strftime("%Y-%m-%d"))
-                elif grouping == "Year-Month":
-                    return os.path.join(base_folder, date_created.strftime("%Y-%m"))
-                
-            
-            elif date_criteria == "Created before":
-                date_str = self.date_entry.get().strip()
-                if not date_str:
-                    return None
-                    
-                target_date = self.validate_date(date_str)
-                if not target_date or date_created.date() >= target_date:
-                    return None
-                    
-                if grouping == "Single folder":
-                    return os.path.join(base_folder, f"Created before {date_str}")
-                elif grouping == "Year":
-                    return os.path.join(base_folder, str(date_created.year))
-                elif grouping == "Month":
-                    return os.path.join(base_folder, date_created.strftime("%Y-%m"))
-                elif grouping == "Day":
-                    return os.path.join(base_folder, date_created.strftime("%Y-%m-%d"))
-                elif grouping == "Year-Month":
-                    return os.path.join(base_folder, date_created.strftime("%Y-%m"))
-              
-            
-            elif date_criteria == "Between dates":
+            if date_criteria == "Between dates":
                 date_from_str = self.date_from_entry.get().strip()
                 date_to_str = self.date_to_entry.get().strip()
-                if not date_from_str or not date_to_str:
-                    return None
-                    
-                date_from = self.validate_date(date_from_str)
-                date_to = self.validate_date(date_to_str)
-                if not date_from or not date_to or not (date_from <= date_created.date() <= date_to):
-                    return None
-                    
-                if grouping == "Single folder":
-                    return os.path.join(base_folder, f"Created between {date_from_str} and {date_to_str}")
-                elif grouping == "Year":
-                    return os.path.join(base_folder, str(date_created.year))
-                elif grouping == "Month":
-                    return os.path.join(base_folder, date_created.strftime("%Y-%m"))
-                elif grouping == "Day":
-                    return os.path.join(base_folder, date_created.strftime("%Y-%m-%d"))
-                elif grouping == "Year-Month":
-                    return os.path.join(base_folder, date_created.strftime("%Y-%m"))
-                
-        elif current_tab == "By Name":
+                folder_name = f"Created between {date_from_str} and {date_to_str}"
+            else:
+                date_from_str = date_to_str = self.date_entry.get().strip()
+                folder_name = f"{date_criteria} {date_from_str}"
+
+            date_from = self.validate_date(date_from_str) if date_from_str else None
+            date_to = self.validate_date(date_to_str) if date_to_str else None
+            if date_from and date_to:
+                values.update(date_criteria=date_criteria, date_from=date_from, date_to=date_to,
+                              date_folder=os.path.join(base_folder, folder_name), grouping=self.date_grouping.get())
+
+        elif mode == "By Name":
             name_contains = self.name_contains_entry.get().strip()
-            if not name_contains:
-                return None
-                
-            position = self.position_var.get()
-            filename_lower = filename.lower()
-            search_text = name_contains.lower()
-            
-            if position == "Anywhere":
-                if search_text not in filename_lower:
-                    return None
-            elif position == "Starts with":
-                if not filename_lower.startswith(search_text):
-                    return None
-            elif position == "Ends with":
-                if not filename_lower.endswith(search_text):
-                    return None
-                
             pattern = self.name_folder_pattern.get()
             if pattern == "Custom":
-                custom_pattern = self.custom_name_pattern.get().strip()
-                if not custom_pattern:
-                    return None
-                folder_name = custom_pattern.format(text=name_contains)
-            else:
-                folder_name = pattern.format(text=name_contains)
-                
-            return os.path.join(base_folder, folder_name)
-    
-    def handle_duplicate(self, dest_path):
-        if not os.path.exists(dest_path):
-            return dest_path
-            
-        handle_method = self.duplicates_var.get()
-        
-        if handle_method == "overwrite":
-            return dest_path
-        elif handle_method == "skip":
-            return None
-            
-        # Default is "rename"
-        counter = 1
-        name, ext = os.path.splitext(dest_path)
-        while os.path.exists(f"{name}_{counter}{ext}"):
-            counter += 1
-            
-        return f"{name}_{counter}{ext}"
+                pattern = self.custom_name_pattern.get().strip()
+            if name_contains and pattern:
+                values.update(name_position=self.position_var.get(), name_text=name_contains.lower(),
+                              name_folder=os.path.join(base_folder, pattern.format(text=name_contains)))
+
+        return OrganizerRules(**values)
     
+    def snapshot_settings(self):
+        # Every input that influences the plan; Execute reuses the previewed plan only while these are unchanged.
+        # Only the selected method's tab counts (the others may not even be built yet).
+        mode = self.org_notebook.tab(self.org_notebook.select(), "text")
+        settings = {
+            'source_folder': self.input_entry.get(),
+            'destination_folder': self.dest_entry.get(),
+            'operation': self.operation_var.get(),
+            'copy_method': self.copy_method_var.get(),
+            'duplicates': self.duplicates_var.get(),
+            'identical': self.identical_var.get(),
+            'tab': mode,
+        }
+        if mode == "By Extension":
+            settings['extensions'] = [self.extensions_entry.get(), self.misc_var.get()]
+        elif mode == "By Size":
+            settings['size'] = [self.size_operator.get(), self.size_value.get(), self.size_unit.get(), self.size_folder_pattern.get()]
+        elif mode == "By Date":
+            settings['date'] = [self.date_criteria.get(), self.date_grouping.get()] + \
+                               [widget.get() for widget in self.date_input_frame.winfo_children() if isinstance(widget, ttk.Entry)]
+        elif mode == "By Name":
+            settings['name'] = [self.position_var.get(), self.name_contains_entry.get(), self.name_folder_pattern.get(),
+                                self.custom_name_pattern.get()]
+        return settings
+
+    def build_plan(self, source_folder):
+        return plan_organization(source_folder, self.compile_rules(), self.operation_var.get(), self.copy_method_var.get(),
+                                 self.duplicates_var.get(), self.identical_var.get(), self.snapshot_settings())
+
+    def show_plan(self, plan):
+        for source, destination, action, size, target in plan.entries:
+            filename = os.path.basename(source)
+            if action == "Skip identical":
+                self.log_message(f"Skip identical: {filename} (same content as {os.path.basename(target)})")
+            elif action == "Skip duplicate":
+                self.log_message(f"Skip duplicate: {filename}")
+            else:
+                self.log_message(f"{filename} → {os.path.dirname(destination)}")
+        for error in plan.errors:
+            self.log_message(error)
+
+        file_count = len(plan.transfers())
+        self.log_message(f"\nFound {file_count} files matching criteria")
+        self.status_var.set(f"Preview complete: {file_count} files would be processed")
+
     def preview_organization(self):
         self.clear_log()
         source_folder = self.input_entry.get()
@@ -1194,87 +2889,67 @@ class FileOrganizerTool:
         self.log_message(f"Scanning: {source_folder}")
         
         try:
-            file_count = 0
-            for root_dir, _, files in os.walk(source_folder):
-                for filename in files:
-                    file_path = os.path.join(root_dir, filename)
-                    try:
-                        file_stat = os.stat(file_path)
-                        
-                        dest_folder = self.get_destination_folder(file_path, file_stat)
-                        if dest_folder:
-                            dest_path = os.path.join(dest_folder, filename)
-                            self.log_message(f"{filename} → {dest_folder}")
-                            file_count += 1
-                    except Exception as e:
-                        self.log_message(f"Error processing {filename}: {str(e)}")
-            
-            self.log_message(f"\nFound {file_count} files matching criteria")
-            self.status_var.set(f"Preview complete: {file_count} files would be processed")
+            self.plan = self.build_plan(source_folder)
+            self.plan_from_file = False
+            self.show_plan(self.plan)
         except Exception as e:
+            self.plan = None
             self.log_message(f"\nError during preview: {str(e)}")
             self.status_var.set("Preview failed")
+
+    def save_plan(self):
+        if self.plan is None:
+            messagebox.showerror("Error", "Run a preview first to build a plan")
+            return
+        file_path = filedialog.asksaveasfilename(title="Save Plan", defaultextension=".json", filetypes=[("JSON Files", "*.json")])
+        if file_path:
+            self.plan.save(file_path)
+            self.status_var.set(f"Plan saved to {file_path}")
+
+    def load_plan(self):
+        file_path = filedialog.askopenfilename(title="Select Plan File", filetypes=[("JSON Files", "*.json")])
+        if not file_path:
+            return
+        self.clear_log()
+        try:
+            self.plan = OrganizationPlan.load(file_path)
+            self.plan_from_file = True
+            self.log_message(f"=== PLAN: {os.path.basename(file_path)} ===")
+            self.show_plan(self.plan)
+        except Exception as e:
+            self.plan = None
+            messagebox.showerror("Error", f"Failed to load plan: {e}")
     
     def execute_organization(self):
+        # A previewed plan is executed as-is, without rescanning, unless the settings changed since
+        plan = self.plan
+        if plan is not None and not self.plan_from_file and plan.settings != self.snapshot_settings():
+            plan = None
+
         self.clear_log()
-        source_folder = self.input_entry.get()
-        dest_base = self.dest_entry.get()
-        operation = self.operation_var.get()
-        
-        if not source_folder or not os.path.exists(source_folder):
-            messagebox.showerror("Error", "Please select a valid source folder")
-            return
-        
-        if not dest_base:
-            messagebox.showerror("Error", "Please select a destination folder")
-            return
-        
-        self.log_message("=== EXECUTION MODE ===")
-        self.log_message(f"Source: {source_folder}")
-        self.log_message(f"Destination: {dest_base}")
-        self.log_message(f"Operation: {operation}")
-        
+        if plan is None:
+            source_folder = self.input_entry.get()
+            if not source_folder or not os.path.exists(source_folder):
+                messagebox.showerror("Error", "Please select a valid source folder")
+                return
+            
+            if not self.dest_entry.get():
+                messagebox.showerror("Error", "Please select a destination folder")
+                return
+
         try:
-            processed = 0
-            skipped = 0
-            errors = 0
+            if plan is None:
+                plan = self.build_plan(source_folder)
             
-            for root_dir, _, files in os.walk(source_folder):
-                for filename in files:
-                    file_path = os.path.join(root_dir, filename)
-                    try:
-                        file_stat = os.stat(file_path)
-                        
-                        dest_folder = self.get_destination_folder(file_path, file_stat)
-                        if not dest_folder:
-                            skipped += 1
-                            continue
-                            
-                        # Ensure destination folder exists
-                        os.makedirs(dest_folder, exist_ok=True)
-                        
-                        dest_path = os.path.join(dest_folder, filename)
-                        
-                        # Handle duplicates
-                        final_dest_path = self.handle_duplicate(dest_path)
-                        if not final_dest_path:
-                            self.log_message(f"Skipped duplicate: {filename}")
-                            skipped += 1
-                            continue
-                            
-                        # Perform operation
-                        if operation == "Move":
-                            shutil.move(file_path, final_dest_path)
-                            action = "Moved"
-                        else:
-                            shutil.copy2(file_path, final_dest_path)
-                            action = "Copied"
-                        
-                        self.log_message(f"{action}: {filename} → {os.path.dirname(final_dest_path)}")
-                        processed += 1
-                    except Exception as e:
-                        self.log_message(f"Error processing {filename}: {str(e)}")
-                        errors += 1
+            self.log_message("=== EXECUTION MODE ===")
+            self.log_message(f"Source: {plan.source_folder}")
+            self.log_message(f"Destination: {plan.destination_folder}")
+            self.log_message(f"Operation: {plan.operation}")
+            for error in plan.errors:
+                self.log_message(error)
+            
+            processed, skipped, errors = execute_plan(plan, self.log_message)
+            self.plan = None
             
             self.log_message(f"\nOperation complete!")
             self.log_message(f"Files processed: {processed}")
@@ -1292,6 +2967,229 @@ class FileOrganizerTool:
             self.status_var.set("Operation failed")
             messagebox.showerror("Error", f"Operation failed: {str(e)}")
 
+# ==================== PATTERN PROFILER ====================
+def split_pattern_segments(regex_pattern):
+    # Split at top-level ".*" / ".*?" gaps, the glue between the capture groups of a row pattern
+    segments = []
+    separators = []
+    depth = 0
+    in_class = False
+    start = i = 0
+    while i < len(regex_pattern):
+        char = regex_pattern[i]
+        if char == '\\':
+            i += 2
+            continue
+        if in_class:
+            in_class = char != ']'
+        elif char == '[':
+            in_class = True
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif depth == 0 and regex_pattern.startswith('.*', i):
+            end = i + 2
+            if regex_pattern[end:end + 1] in ('?', '+'):
+                end += 1
+            segments.append(regex_pattern[start:i])
+            separators.append(regex_pattern[i:end])
+            start = i = end
+            continue
+        i += 1
+    segments.append(regex_pattern[start:])
+    return segments, separators
+
+def time_pattern(regex_pattern, texts, repeat):
+    compiled = re.compile(regex_pattern, re.MULTILINE)
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            compiled.findall(text)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def suggest_pattern_changes(segments, separators, texts, sample_limit=10000):
+    suggestions = []
+    group_counts = [re.compile(segment).groups for segment in segments]
+    instrumented = "".join(segment + (f"({separators[idx]})" if idx < len(separators) else "")
+                           for idx, segment in enumerate(segments))
+    compiled = re.compile(instrumented, re.MULTILINE)
+
+    gaps = [[] for _ in separators]
+    line_starts = 0
+    sampled = 0
+    for text in texts:
+        for match in compiled.finditer(text):
+            if match.start() == 0 or text[match.start() - 1] == '\n':
+                line_starts += 1
+            for idx in range(len(separators)):
+                gaps[idx].append(match.group(sum(group_counts[:idx + 1]) + idx + 1))
+            sampled += 1
+            if sampled >= sample_limit:
+                break
+
+    if not sampled:
+        return ["The pattern found no matches, so there is nothing to base suggestions on."]
+
+    if not segments[0].startswith('^') and line_starts == sampled:
+        suggestions.append("Every match starts a line: anchor the pattern with '^' so failed attempts stop at the first segment.")
+
+    for idx, separator in enumerate(separators):
+        between = f"'{separator}' between segment {idx + 1} and {idx + 2}"
+        if all(not gap.strip() for gap in gaps[idx]):
+            replacement = r"\s+" if all(gaps[idx]) else r"\s*"
+            suggestions.append(f"{between} only ever spans whitespace: use '{replacement}' instead.")
+        else:
+            longest = max(len(gap) for gap in gaps[idx])
+            suggestions.append(f"{between} spans at most {longest} characters: bound it as '.{{0,{longest}}}?' to cap backtracking.")
+
+    if sys.version_info >= (3, 11):
+        for idx, segment in enumerate(segments):
+            if re.search(r'(\]|\\[wdsWDS])[+*](?![?+])', segment):
+                suggestions.append(f"Segment {idx + 1} '{segment}' has greedy character-class repeats: a possessive form such as '++' "
+                                   f"or an atomic group '(?>...)' stops them giving characters back when a later segment fails.")
+    return suggestions
+
+def profile_pattern(input_folder, regex_pattern, repeat=3):
+    pdf_files = sorted(file for file in os.listdir(input_folder) if file.endswith('.pdf'))
+    texts = [pdf_text_cache.get(os.path.join(input_folder, pdf_file)) for pdf_file in pdf_files]
+    compiled = re.compile(regex_pattern, re.MULTILINE)
+
+    files = []
+    for pdf_file, text in zip(pdf_files, texts):
+        files.append({
+            'file': pdf_file,
+            'chars': len(text),
+            'matches': len(compiled.findall(text)),
+            'seconds': time_pattern(regex_pattern, [text], repeat),
+        })
+    total = sum(entry['seconds'] for entry in files)
+    matches = sum(entry['matches'] for entry in files)
+
+    # Time each prefix of the pattern; the jump a segment adds approximates the backtracking it causes
+    segments, separators = split_pattern_segments(regex_pattern)
+    segment_costs = []
+    previous = 0.0
+    for idx in range(len(segments)):
+        prefix = "".join(segment + separators[pos] for pos, segment in enumerate(segments[:idx])) + segments[idx]
+        elapsed = time_pattern(prefix, texts, repeat)
+        segment_costs.append({'segment': segments[idx], 'seconds': max(elapsed - previous, 0.0)})
+        previous = elapsed
+
+    return {
+        'pattern': regex_pattern,
+        'files': files,
+        'total_seconds': total,
+        'matches': matches,
+        'matches_per_second': matches / total if total else 0.0,
+        'segments': segment_costs,
+        'suggestions': suggest_pattern_changes(segments, separators, texts),
+    }
+
+def print_pattern_profile(report):
+    print(f"Pattern: {report['pattern']}")
+    print(f"Total: {report['total_seconds'] * 1000:.2f} ms, {report['matches']} matches, "
+          f"{report['matches_per_second']:,.0f} matches/s")
+    print("\nPer file:")
+    for entry in report['files']:
+        print(f"  {entry['file']}: {entry['seconds'] * 1000:.2f} ms, {entry['matches']} matches, {entry['chars']} chars")
+
+    print("\nSegment cost (estimate):")
+    segment_total = sum(entry['seconds'] for entry in report['segments']) or 1.0
+    hotspot = max(report['segments'], key=lambda entry: entry['seconds'])
+    for idx, entry in enumerate(report['segments']):
+        marker = "  <- hotspot" if entry is hotspot and len(report['segments']) > 1 else ""
+        print(f"  {idx + 1}. {entry['segment']}: {entry['seconds'] * 1000:.2f} ms "
+              f"({entry['seconds'] / segment_total:.0%}){marker}")
+
+    print("\nSuggestions:")
+    for suggestion in report['suggestions']:
+        print(f"  - {suggestion}")
+
+# ==================== COMMAND LINE ====================
+def load_cli_config(args, *keys):
+    config = {}
+    if args.config:
+        with open(args.config, 'r') as file:
+            config = json.load(file)
+    for key in keys:
+        value = getattr(args, key, None)
+        if value is not None:
+            config[key] = value
+    return config
+
+def run_cli(argv):
+    parser = argparse.ArgumentParser(description="PDF to Excel Converter command line tools.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    profile_parser = subparsers.add_parser("profile-pattern", help="Profile an invisible-grid regex against the PDFs in a folder")
+    profile_parser.add_argument("--config", help="Saved invisible grid configuration (JSON)")
+    profile_parser.add_argument("--input-folder", dest="input_folder")
+    profile_parser.add_argument("--pattern", dest="regex_pattern")
+    profile_parser.add_argument("--repeat", type=int, default=3, help="Timing runs per measurement (best is kept)")
+
+    convert_parser = subparsers.add_parser("convert", help="Convert a folder of PDFs and report the time spent in each stage")
+    convert_parser.add_argument("converter", choices=["invisible", "grid"])
+    convert_parser.add_argument("--config", help="Saved converter configuration (JSON)")
+    convert_parser.add_argument("--input-folder", dest="input_folder")
+    convert_parser.add_argument("--output-folder", dest="output_folder")
+    convert_parser.add_argument("--pattern", dest="regex_pattern")
+    convert_parser.add_argument("--columns", dest="column_names", type=lambda value: [col.strip() for col in value.split(',') if col.strip()],
+                                help="Comma-separated column names")
+    convert_parser.add_argument("--filter-index", dest="filter_index", type=int, help="Grid converter: column the pattern is matched against")
+    convert_parser.add_argument("--profile", choices=["run", "slowest"],
+                                help="Save a cProfile of the whole run, or of the slowest files, to the output folder")
+    convert_parser.add_argument("--profile-keep", type=int, default=5, help="How many of the slowest files to keep profiles for")
+    convert_parser.add_argument("--metrics-textfile", help="Write Prometheus metrics to this file (for a textfile collector)")
+
+    plan_parser = subparsers.add_parser("run-plan", help="Execute a File Organizer plan saved from the Preview")
+    plan_parser.add_argument("plan", help="Plan file (JSON)")
+    plan_parser.add_argument("--dry-run", action="store_true", help="List the planned actions without executing them")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "profile-pattern":
+        config = load_cli_config(args, 'input_folder', 'regex_pattern')
+        if not config.get('input_folder') or not config.get('regex_pattern'):
+            parser.error("an input folder and a regex pattern are required (directly or via --config)")
+        print_pattern_profile(profile_pattern(config['input_folder'], config['regex_pattern'], args.repeat))
+    elif args.command == "convert":
+        config = load_cli_config(args, 'input_folder', 'output_folder', 'regex_pattern', 'column_names', 'filter_index')
+        if not config.get('input_folder') or not config.get('output_folder') or not config.get('regex_pattern'):
+            parser.error("an input folder, an output folder and a regex pattern are required (directly or via --config)")
+        if args.converter == "invisible" and not config.get('column_names'):
+            parser.error("the invisible grid converter needs column names (directly or via --config)")
+        if args.metrics_textfile:
+            export_metrics_textfile(args.metrics_textfile)
+        profiler = ConversionProfiler(args.profile, args.profile_keep) if args.profile else None
+        if args.converter == "invisible":
+            timer = InvisibleGridConverter().convert_pdfs_to_excel(
+                config['input_folder'], config['output_folder'], config.get('column_names', []), config['regex_pattern'], profiler)
+        else:
+            timer = GridBasedConverter().convert_pdfs_to_excel(
+                config['input_folder'], config['output_folder'], config.get('column_names', []), config['regex_pattern'],
+                config.get('filter_index', 0), profiler)
+        print(f"Converted {timer.summary().get('file', {}).get('count', 0)} files\n\nStage timings:")
+        print(timer.format_summary())
+        if profiler and profiler.saved_files:
+            print("\nProfiles saved:")
+            for saved_file in profiler.saved_files:
+                print(f"  {saved_file}")
+    elif args.command == "run-plan":
+        plan = OrganizationPlan.load(args.plan)
+        if args.dry_run:
+            for source, destination, action, size, target in plan.entries:
+                print(f"{action}: {source} → {destination} ({size} bytes)")
+            print(f"{len(plan.transfers())} files would be processed, {plan.unmatched} do not match the criteria")
+            return 0
+        processed, skipped, errors = execute_plan(plan, print)
+        print(f"\nFiles processed: {processed}\nFiles skipped: {skipped}\nErrors encountered: {errors}")
+        return 1 if errors else 0
+    return 0
+
 # ==================== MAIN APPLICATION ====================
 class PDFConverterApp:
     def __init__(self, root):
@@ -1314,18 +3212,31 @@ class PDFConverterApp:
         self.flatten_tab = ttk.Frame(self.notebook)
         self.file_organizer_tab = ttk.Frame(self.notebook)
         
-        self.notebook.add(self.invisible_tab, text="Invisible Grid Converter")
-        self.notebook.add(self.grid_tab, text="Grid-Based Converter")
-        self.notebook.add(self.flatten_tab, text="Flatten Folder")
-        self.notebook.add(self.file_organizer_tab, text="File Organizer")
-        
-        # Initialize all tools
+        # Tools are built when their tab is first selected; the window appears with empty frames first
+        self.invisible_converter = self.grid_converter = self.flatten_tool = self.file_organizer = None
+        self.tabs = LazyNotebook(self.notebook)
+        self.tabs.add(self.invisible_tab, "Invisible Grid Converter", self.build_invisible_converter)
+        self.tabs.add(self.grid_tab, "Grid-Based Converter", self.build_grid_converter)
+        self.tabs.add(self.flatten_tab, "Flatten Folder", self.build_flatten_tool)
+        self.tabs.add(self.file_organizer_tab, "File Organizer", self.build_file_organizer)
+        self.root.after_idle(self.tabs.build_selected)
+
+    def build_invisible_converter(self):
         self.invisible_converter = InvisibleGridConverter(self.invisible_tab)
+
+    def build_grid_converter(self):
         self.grid_converter = GridBasedConverter(self.grid_tab)
+
+    def build_flatten_tool(self):
         self.flatten_tool = FlattenFolderTool(self.flatten_tab)
+
+    def build_file_organizer(self):
         self.file_organizer = FileOrganizerTool(self.file_organizer_tab)
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(run_cli(sys.argv[1:]))
+
     try:
         # Set theme if available
         from ttkthemes import ThemedTk
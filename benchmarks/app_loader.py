@@ -0,0 +1,12 @@
+import importlib.util
+import os
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(REPO_DIR, "PDF To Excel Converter(One_App_v3.1).py")
+
+def load_app():
+    # The app is a single script with spaces in its name, so it is loaded by path
+    spec = importlib.util.spec_from_file_location("pdf_to_excel_app", APP_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
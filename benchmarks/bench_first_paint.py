@@ -0,0 +1,79 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Runs in a fresh interpreter: time from before the app module loads until the main window is first exposed
+FIRST_PAINT = '''
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {bench_dir!r})
+from app_loader import load_app
+app = load_app()
+import tkinter as tk
+try:
+    from ttkthemes import ThemedTk
+    root = ThemedTk(theme="arc")
+except ImportError:
+    root = tk.Tk()
+timings = {{}}
+
+def on_expose(event):
+    if event.widget is root and 'first_paint' not in timings:
+        root.update_idletasks()
+        timings['first_paint'] = time.perf_counter() - start
+        root.after(1, finish)
+
+def finish():
+    # Tabs not built yet (lazy) are built here, to show what selecting each of them costs
+    for tab in window.notebook.tabs():
+        before = time.perf_counter()
+        window.notebook.select(tab)
+        root.update()
+        timings[window.notebook.tab(tab, "text")] = time.perf_counter() - before
+    print(json.dumps(timings))
+    root.destroy()
+
+root.bind("<Expose>", on_expose)
+window = app.PDFConverterApp(root)
+if {eager!r}:
+    # The old behaviour: every tab built before the window is shown
+    for tab in window.notebook.tabs():
+        window.notebook.select(tab)
+        window.tabs.build_selected()
+    window.notebook.select(window.notebook.tabs()[0])
+root.mainloop()
+'''
+
+def measure(eager):
+    completed = subprocess.run([sys.executable, "-c", FIRST_PAINT.format(bench_dir=BENCH_DIR, eager=eager)],
+                               capture_output=True, text=True, check=True)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure time to first paint of the main window with lazy and eager tab construction.")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per mode (best is kept)")
+    parser.add_argument("--json", dest="json_file", help="Write the timings to this file")
+    args = parser.parse_args()
+
+    report = {}
+    for mode, eager in (("eager", True), ("lazy", False)):
+        try:
+            runs = [measure(eager) for _ in range(args.repeat)]
+        except subprocess.CalledProcessError as e:
+            sys.exit(f"The window could not be opened (is a display available?)\n{e.stderr}")
+        report[mode] = best = min(runs, key=lambda run: run['first_paint'])
+        print(f"{mode}: first paint {best['first_paint'] * 1000:.1f} ms")
+        for tab, seconds in best.items():
+            if tab != 'first_paint':
+                print(f"  select {tab}: {seconds * 1000:.1f} ms")
+
+    if args.json_file:
+        with open(args.json_file, 'w') as file:
+            json.dump(report, file, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import argparse
+import glob
+import json
+import os
+import time
+
+from app_loader import load_app
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+def bench_page(app, content, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = app.parse_regexlib_results(content)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return {
+        'results': len(results),
+        'bytes': len(content),
+        'min_ms': timings[0] * 1000,
+        'median_ms': timings[len(timings) // 2] * 1000,
+        'max_ms': timings[-1] * 1000,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parsing of saved regexlib search result pages.")
+    parser.add_argument("pages", nargs="*", help="Saved result pages (default: benchmarks/fixtures/regexlib_*.html)")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--json", dest="json_file", help="Write the timings to this file")
+    args = parser.parse_args()
+
+    app = load_app()
+    pages = args.pages or sorted(glob.glob(os.path.join(FIXTURES_DIR, "regexlib_*.html")))
+    report = {}
+    for page in pages:
+        with open(page, 'rb') as file:
+            content = file.read()
+        report[os.path.basename(page)] = stats = bench_page(app, content, args.repeat)
+        print(f"{os.path.basename(page)}: {stats['results']} results, {stats['bytes']} bytes, "
+              f"median {stats['median_ms']:.2f} ms (min {stats['min_ms']:.2f}, max {stats['max_ms']:.2f})")
+
+    if args.json_file:
+        with open(args.json_file, 'w') as file:
+            json.dump(report, file, indent=2)
+
+if __name__ == "__main__":
+    main()
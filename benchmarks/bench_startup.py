@@ -0,0 +1,75 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from app_loader import APP_PATH
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+# Imported on first use by the app; timed on their own to show what a cold first use costs
+LAZY_MODULES = ("pdfplumber", "pandas", "requests", "tkcalendar")
+
+LOAD_APP = (
+    "import sys, time\n"
+    f"sys.path.insert(0, {BENCH_DIR!r})\n"
+    "start = time.perf_counter()\n"
+    "from app_loader import load_app\n"
+    "load_app()\n"
+    "print(time.perf_counter() - start)\n"
+)
+
+def import_times(code):
+    # Runs code in a fresh interpreter under -X importtime; returns its stdout and
+    # {top-level module: cumulative microseconds}
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, check=True)
+    modules = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit() or name.startswith("  "):
+            continue
+        # Top-level imports are the unindented ones; nested imports are counted in their cumulative time
+        top_level = name.strip().split(".")[0]
+        modules[top_level] = modules.get(top_level, 0) + int(cumulative)
+    return completed.stdout, modules
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure how long the app takes to load and what each import costs.")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per measurement (best is kept)")
+    parser.add_argument("--top", type=int, default=15, help="Modules to list")
+    parser.add_argument("--json", dest="json_file", help="Write the timings to this file")
+    args = parser.parse_args()
+
+    best_load = None
+    best_modules = {}
+    for _ in range(args.repeat):
+        stdout, modules = import_times(LOAD_APP)
+        seconds = float(stdout.strip().splitlines()[-1])
+        if best_load is None or seconds < best_load:
+            best_load, best_modules = seconds, modules
+
+    lazy = {}
+    for module in LAZY_MODULES:
+        try:
+            lazy[module] = min(import_times(f"import {module}")[1].get(module, 0) for _ in range(args.repeat)) / 1e6
+        except subprocess.CalledProcessError:
+            lazy[module] = None
+
+    print(f"Module load of {os.path.basename(APP_PATH)}: {best_load * 1000:.1f} ms")
+    print("\nImport cost at startup (cumulative):")
+    for module, micros in sorted(best_modules.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"  {module:<20} {micros / 1000:8.1f} ms")
+    print("\nDeferred until first use:")
+    for module, seconds in lazy.items():
+        loaded = " (imported at startup!)" if module in best_modules else ""
+        cost = "not installed" if seconds is None else f"{seconds * 1000:8.1f} ms"
+        print(f"  {module:<20} {cost}{loaded}")
+
+    if args.json_file:
+        with open(args.json_file, 'w') as file:
+            json.dump({'load_seconds': best_load, 'startup_imports_us': best_modules, 'deferred_seconds': lazy}, file, indent=2)
+
+if __name__ == "__main__":
+    main()
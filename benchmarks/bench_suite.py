@@ -0,0 +1,187 @@
+import argparse
+import json
+import math
+import os
+import platform
+import queue
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from app_loader import REPO_DIR, load_app
+from make_corpus import add_corpus_arguments, corpus_params, load_or_generate
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SCENARIOS = ("invisible", "grid", "flatten", "organizer")
+
+def counter_total(app, name):
+    return sum(app.metrics.counters.get(name, {}).values())
+
+def run_converter(app, scenario, corpus_dir, manifest, output_folder):
+    files_before = counter_total(app, 'pdf_converter_files_total')
+    pages_before = counter_total(app, 'pdf_converter_pages_total')
+    rows_before = counter_total(app, 'pdf_converter_rows_total')
+    start = time.perf_counter()
+    if scenario == "invisible":
+        timer = app.InvisibleGridConverter().convert_pdfs_to_excel(
+            os.path.join(corpus_dir, "unruled"), output_folder, manifest['column_names'], manifest['invisible_pattern'])
+    else:
+        timer = app.GridBasedConverter().convert_pdfs_to_excel(
+            os.path.join(corpus_dir, "ruled"), output_folder, [], manifest['grid_pattern'], manifest['grid_filter_index'])
+    seconds = time.perf_counter() - start
+    return {
+        'seconds': seconds,
+        'files': counter_total(app, 'pdf_converter_files_total') - files_before,
+        'pages': counter_total(app, 'pdf_converter_pages_total') - pages_before,
+        'rows': counter_total(app, 'pdf_converter_rows_total') - rows_before,
+        'latencies': timer.samples.get('file', []),
+    }
+
+def run_flatten(app, corpus_dir, manifest, output_folder):
+    tool = app.FlattenFolderTool()
+    start = time.perf_counter()
+    tool.run_extraction(os.path.join(corpus_dir, "tree"), output_folder, "Copy", None, "rename", (1, None))
+    seconds = time.perf_counter() - start
+    processed = 0
+    while True:
+        try:
+            event = tool.progress_queue.get_nowait()
+        except queue.Empty:
+            break
+        if event[0] == "error":
+            raise RuntimeError(event[1])
+        if event[0] == "done":
+            processed = event[1]
+    return {'seconds': seconds, 'files': processed, 'pages': 0, 'rows': 0, 'latencies': []}
+
+def run_organizer(app, corpus_dir, manifest, output_folder):
+    # The File Organizer's own planning (scan, classify, name collisions, identical-file check) and
+    # execution, with the rules its By Extension tab would compile
+    values = dict.fromkeys(app.OrganizerRules._fields)
+    values.update(mode="By Extension", base_folder=output_folder, extensions=frozenset(("pdf", "txt", "csv")),
+                  misc_folder=os.path.join(output_folder, "Miscellaneous extension files"))
+    rules = app.OrganizerRules(**values)
+
+    start = time.perf_counter()
+    plan = app.plan_organization(os.path.join(corpus_dir, "tree"), rules, "Copy", duplicates="rename", identical="Skip")
+    processed, _, errors = app.execute_plan(plan, lambda message: None)
+    seconds = time.perf_counter() - start
+    if errors:
+        raise RuntimeError(f"{errors} files failed to organize")
+    return {'seconds': seconds, 'files': processed, 'pages': 0, 'rows': 0, 'latencies': []}
+
+def peak_rss():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[max(math.ceil(fraction * len(ordered)) - 1, 0)]
+
+def run_scenario(scenario, corpus_dir, warmup):
+    # Runs inside its own process for a single measured run, so peak RSS belongs to that run alone
+    app = load_app()
+    with open(os.path.join(corpus_dir, "manifest.json"), 'r') as file:
+        manifest = json.load(file)
+
+    for index in range(warmup + 1):
+        output_folder = tempfile.mkdtemp(prefix=f"bench_{scenario}_")
+        try:
+            if scenario in ("invisible", "grid"):
+                result = run_converter(app, scenario, corpus_dir, manifest, output_folder)
+            elif scenario == "flatten":
+                result = run_flatten(app, corpus_dir, manifest, output_folder)
+            else:
+                result = run_organizer(app, corpus_dir, manifest, output_folder)
+        finally:
+            shutil.rmtree(output_folder, ignore_errors=True)
+
+    seconds = result['seconds']
+    result.update({metric + '_per_s': result[metric] / seconds if seconds else 0.0 for metric in ('files', 'pages', 'rows')})
+    result['peak_rss_bytes'] = peak_rss()
+    return result
+
+def summarize_runs(runs):
+    # Converters report per-file latency; the file tools report the whole pass
+    samples = [latency for run in runs for latency in run.pop('latencies')] or [run['seconds'] for run in runs]
+    return {
+        'runs': runs,
+        'latency_ms': {'p50': percentile(samples, 0.5) * 1000, 'p95': percentile(samples, 0.95) * 1000, 'max': max(samples) * 1000},
+        'peak_rss_bytes': max(run['peak_rss_bytes'] for run in runs) if all(run['peak_rss_bytes'] for run in runs) else None,
+    }
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPO_DIR, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the converters, Flatten Folder and File Organizer on a synthetic corpus.")
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS, help="Scenario to run (repeatable, default: all)")
+    parser.add_argument("--corpus", default=os.path.join(BENCH_DIR, "corpus"), help="Corpus folder, generated when missing")
+    parser.add_argument("--repeat", type=int, default=5, help="Measured runs per scenario")
+    parser.add_argument("--warmup", type=int, default=1, help="Unmeasured runs before each measured one, in the same process")
+    parser.add_argument("--json", dest="json_file", default="bench_results.json", help="Write the results to this file")
+    parser.add_argument("--run-scenario", help=argparse.SUPPRESS)
+    add_corpus_arguments(parser)
+    args = parser.parse_args()
+
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+
+    corpus_dir = os.path.abspath(args.corpus)
+    if args.run_scenario:
+        json.dump(run_scenario(args.run_scenario, corpus_dir, args.warmup), sys.stdout)
+        return
+
+    manifest = load_or_generate(corpus_dir, **corpus_params(args))
+    report = {
+        'commit': git_commit(),
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'corpus': manifest['params'],
+        'repeat': args.repeat,
+        'scenarios': {},
+        'failed': [],
+    }
+    for scenario in args.scenario or SCENARIOS:
+        # Every measured run gets a fresh process from a scratch directory: peak RSS is then one sample per run,
+        # and the run log stays out of the repo
+        runs = []
+        for _ in range(args.repeat):
+            with tempfile.TemporaryDirectory(prefix="bench_cwd_") as work_dir:
+                completed = subprocess.run([sys.executable, os.path.abspath(__file__), "--run-scenario", scenario, "--corpus", corpus_dir,
+                                            "--warmup", str(args.warmup)],
+                                           cwd=work_dir, capture_output=True, text=True)
+            if completed.returncode:
+                break
+            runs.append(json.loads(completed.stdout))
+        if completed.returncode:
+            # Recorded so compare_bench.py rejects the file instead of comparing the scenarios that did run
+            print(f"{scenario}: failed\n{completed.stderr}", file=sys.stderr)
+            report['failed'].append(scenario)
+            continue
+        report['scenarios'][scenario] = stats = summarize_runs(runs)
+        best = max(stats['runs'], key=lambda run: run['files_per_s'])
+        rss = f"{stats['peak_rss_bytes'] / 1024 / 1024:.0f} MB" if stats['peak_rss_bytes'] else "n/a"
+        print(f"{scenario}: {best['files_per_s']:.1f} files/s, {best['pages_per_s']:.1f} pages/s, {best['rows_per_s']:.0f} rows/s, "
+              f"latency p50 {stats['latency_ms']['p50']:.1f} ms, p95 {stats['latency_ms']['p95']:.1f} ms, peak RSS {rss}")
+
+    with open(args.json_file, 'w') as file:
+        json.dump(report, file, indent=2)
+    print(f"Results written to {args.json_file}")
+    if report['failed']:
+        sys.exit(f"Failed scenarios: {', '.join(report['failed'])}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import argparse
+import itertools
+import json
+import math
+import random
+import sys
+
+# Throughput metrics taken from every measured run; higher is better
+RATE_METRICS = ("files_per_s", "pages_per_s", "rows_per_s")
+
+def mean(values):
+    return sum(values) / len(values)
+
+def permutation_p_value(baseline, candidate, permutations=20000, seed=0):
+    # One-sided: how often a random split of the pooled runs puts the candidate this far below the baseline.
+    # Exact for the handful of runs a benchmark usually has, sampled beyond that.
+    observed = mean(baseline) - mean(candidate)
+    pooled = baseline + candidate
+    size = len(baseline)
+    total = sum(pooled)
+    if math.comb(len(pooled), size) <= permutations:
+        splits = [sum(pooled[idx] for idx in chosen) for chosen in itertools.combinations(range(len(pooled)), size)]
+    else:
+        rng = random.Random(seed)
+        splits = [sum(rng.sample(pooled, size)) for _ in range(permutations)]
+    at_least = sum(1 for split in splits if split / size - (total - split) / len(candidate) >= observed - 1e-12)
+    return at_least / len(splits)
+
+def compare_samples(metric, baseline, candidate, threshold, alpha, higher_is_better=True):
+    before, after = mean(baseline), mean(candidate)
+    if not before:
+        return None
+    change = (after - before) / before
+    # The smallest p an exact test can give is one split in C(n, k). With too few runs (3 against 3 gives
+    # exactly 0.05) it can never get below alpha, so the threshold alone decides and the caller warns.
+    testable = 1 / math.comb(len(baseline) + len(candidate), len(baseline)) < alpha
+    p_value = None
+    if testable:
+        # The test looks for the candidate being lower, so metrics where lower is better are negated
+        sign = 1 if higher_is_better else -1
+        p_value = permutation_p_value([sign * value for value in baseline], [sign * value for value in candidate])
+    worse = change < -threshold if higher_is_better else change > threshold
+    regressed = worse and (p_value is None or p_value < alpha)
+    return {'metric': metric, 'baseline': before, 'candidate': after, 'change': change, 'p_value': p_value, 'regressed': regressed,
+            'testable': testable}
+
+def compare_rates(baseline_runs, candidate_runs, metric, threshold, alpha):
+    return compare_samples(metric, [run[metric] for run in baseline_runs], [run[metric] for run in candidate_runs], threshold, alpha)
+
+def compare_memory(baseline_stats, candidate_stats, threshold, alpha):
+    # bench_suite.py measures every run in its own process, so each run carries its own peak RSS;
+    # older result files only have the scenario-wide peak, a single sample judged by the threshold alone
+    def samples(stats):
+        per_run = [run.get('peak_rss_bytes') for run in stats['runs']]
+        if per_run and all(per_run):
+            return per_run
+        return [stats['peak_rss_bytes']] if stats.get('peak_rss_bytes') else None
+    baseline, candidate = samples(baseline_stats), samples(candidate_stats)
+    if not baseline or not candidate:
+        return None
+    megabytes = 1024 * 1024
+    return compare_samples("peak_rss_mb", [value / megabytes for value in baseline], [value / megabytes for value in candidate],
+                           threshold, alpha, higher_is_better=False)
+
+def compare_reports(baseline, candidate, threshold=0.05, memory_threshold=0.10, alpha=0.05):
+    results = {}
+    for scenario, baseline_stats in baseline['scenarios'].items():
+        candidate_stats = candidate['scenarios'].get(scenario)
+        if candidate_stats is None:
+            continue
+        rows = [compare_rates(baseline_stats['runs'], candidate_stats['runs'], metric, threshold, alpha) for metric in RATE_METRICS]
+        rows.append(compare_memory(baseline_stats, candidate_stats, memory_threshold, alpha))
+        results[scenario] = [row for row in rows if row is not None]
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare two bench_suite.py result files and fail when the candidate is significantly slower or larger.")
+    parser.add_argument("baseline", help="Results of the reference commit")
+    parser.add_argument("candidate", help="Results of the commit under test")
+    parser.add_argument("--threshold", type=float, default=5.0, help="Allowed throughput drop in percent (default 5)")
+    parser.add_argument("--memory-threshold", type=float, default=10.0, help="Allowed peak RSS growth in percent (default 10)")
+    parser.add_argument("--alpha", type=float, default=0.05, help="Significance level for throughput drops and peak RSS growth (default 0.05)")
+    args = parser.parse_args()
+
+    with open(args.baseline, 'r') as file:
+        baseline = json.load(file)
+    with open(args.candidate, 'r') as file:
+        candidate = json.load(file)
+    if baseline.get('corpus') != candidate.get('corpus'):
+        print("Warning: the two runs used different corpus parameters", file=sys.stderr)
+
+    results = compare_reports(baseline, candidate, args.threshold / 100, args.memory_threshold / 100, args.alpha)
+    # A scenario that crashed or is missing from the candidate counts as a failure, not as nothing to compare
+    failed = sorted(set(candidate.get('failed', [])) | (set(baseline['scenarios']) - set(results)))
+    for scenario in baseline['scenarios']:
+        if scenario in failed:
+            continue
+        untestable = [row['metric'] for row in results[scenario] if not row['testable']]
+        if untestable:
+            print(f"Warning: too few runs of '{scenario}' to show a significant change at alpha={args.alpha}; "
+                  f"{', '.join(untestable)} judged by the threshold alone (use a larger --repeat)", file=sys.stderr)
+
+    print(f"{baseline.get('commit') or args.baseline} -> {candidate.get('commit') or args.candidate}")
+    regressions = 0
+    for scenario, rows in results.items():
+        print(f"\n{scenario}:")
+        for row in rows:
+            p_value = "" if row['p_value'] is None else f"  p={row['p_value']:.3f}"
+            status = "REGRESSION" if row['regressed'] else "ok"
+            print(f"  {row['metric']:<12} {row['baseline']:>12.2f} -> {row['candidate']:>12.2f}  {row['change']:+7.1%}{p_value}  {status}")
+            regressions += row['regressed']
+
+    for scenario in failed:
+        print(f"\n{scenario}: FAILED (missing from {args.candidate})")
+
+    print(f"\n{regressions} regression(s), {len(failed)} failed scenario(s)")
+    return 1 if regressions or failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
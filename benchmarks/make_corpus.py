@@ -0,0 +1,210 @@
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+
+PAGE_WIDTH = 612
+PAGE_HEIGHT = 792
+MARGIN = 40
+ROW_HEIGHT = 14
+FONT_SIZE = 8
+# Written into every manifest; load_or_generate only ever deletes a folder whose manifest carries it
+GENERATOR = "benchmarks/make_corpus.py"
+
+WORDS = ("alpha", "bravo", "cargo", "delta", "engine", "freight", "gasket", "harbor", "intake", "joint", "kernel",
+         "lever", "motor", "nozzle", "outlet", "piston", "quarry", "rotor", "sensor", "tank", "valve", "winch")
+NOISE_LINES = ("Subtotal carried forward", "Continued on next page", "Remarks: see attached schedule",
+               "Prepared by accounts department", "Totals exclude pending adjustments")
+
+# Column kinds in the order they are used; wider tables repeat the last three
+COLUMN_KINDS = ("id", "date", "code", "text", "amount")
+COLUMN_PATTERNS = {
+    'id': r"(\d{6})",
+    'date': r"(\d{4}-\d{2}-\d{2})",
+    'code': r"([A-Z]{3}\d{2})",
+    'text': r"([a-z]+(?: [a-z]+)*)",
+    'amount': r"(-?\d+\.\d{2})",
+}
+COLUMN_TITLES = {'id': "Number", 'date': "Date", 'code': "Code", 'text': "Description", 'amount': "Amount"}
+
+def column_kinds(columns):
+    kinds = list(COLUMN_KINDS[:columns])
+    while len(kinds) < columns:
+        kinds.append(COLUMN_KINDS[2 + (len(kinds) - 2) % 3])
+    return kinds
+
+def column_names(kinds):
+    return [f"{COLUMN_TITLES[kind]} {idx + 1}" if kinds.count(kind) > 1 else COLUMN_TITLES[kind] for idx, kind in enumerate(kinds)]
+
+def cell_value(rng, kind, row_number):
+    if kind == 'id':
+        return f"{row_number:06d}"
+    if kind == 'date':
+        return f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+    if kind == 'code':
+        return "".join(rng.choice("ABCDEFGHJKLMNPRSTUVWXYZ") for _ in range(3)) + f"{rng.randint(0, 99):02d}"
+    if kind == 'text':
+        return " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 2)))
+    return f"{rng.uniform(-500, 5000):.2f}"
+
+def escape_text(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+def page_stream(texts, lines):
+    # texts are (x, y, text) at the baseline, lines are (x1, y1, x2, y2) strokes
+    ops = ["0.5 w"]
+    ops += [f"{x1:.2f} {y1:.2f} m {x2:.2f} {y2:.2f} l S" for x1, y1, x2, y2 in lines]
+    ops.append(f"BT /F1 {FONT_SIZE} Tf")
+    ops += [f"1 0 0 1 {x:.2f} {y:.2f} Tm ({escape_text(text)}) Tj" for x, y, text in texts]
+    ops.append("ET")
+    return "\n".join(ops).encode('latin-1')
+
+def write_pdf(path, streams):
+    # Catalog, page tree and one shared Helvetica font, then a page and a content stream per page
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None,
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>"]
+    kids = []
+    for stream in streams:
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>".encode('latin-1'))
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>".encode('latin-1')
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode('latin-1') + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode('latin-1')
+    out += b"".join(f"{offset:010d} 00000 n \n".encode('latin-1') for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode('latin-1')
+    with open(path, 'wb') as file:
+        file.write(out)
+
+def schedule_pages(rng, pages, rows, kinds, noise, ruled, first_row):
+    # One schedule: a title, the header row on every page, data rows and, with noise, stray non-matching rows
+    names = column_names(kinds)
+    column_width = (PAGE_WIDTH - 2 * MARGIN) / len(kinds)
+    max_chars = int(column_width / (FONT_SIZE * 0.55))
+    row_number = first_row
+    streams = []
+    data_rows = 0
+    for page in range(pages):
+        texts = [(MARGIN, PAGE_HEIGHT - MARGIN, f"Schedule of items - page {page + 1} of {pages}")]
+        table = [names]
+        for _ in range(rows):
+            if noise and rng.random() < noise:
+                table.append([rng.choice(NOISE_LINES)] + [""] * (len(kinds) - 1))
+                continue
+            table.append([cell_value(rng, kind, row_number) for kind in kinds])
+            row_number += 1
+            data_rows += 1
+
+        top = PAGE_HEIGHT - MARGIN - 2 * ROW_HEIGHT
+        lines = []
+        for idx, cells in enumerate(table):
+            baseline = top - (idx + 1) * ROW_HEIGHT + 4
+            for column, value in enumerate(cells):
+                if not value:
+                    continue
+                # Noise rows are one long cell in an unruled layout; in a ruled one they stay in the first cell
+                limit = max_chars if ruled or column or any(cells[1:]) else max_chars * len(kinds)
+                texts.append((MARGIN + column * column_width + 2, baseline, value[:limit]))
+        if ruled:
+            bottom = top - len(table) * ROW_HEIGHT
+            for idx in range(len(table) + 1):
+                y = top - idx * ROW_HEIGHT
+                lines.append((MARGIN, y, PAGE_WIDTH - MARGIN, y))
+            for column in range(len(kinds) + 1):
+                x = MARGIN + column * column_width
+                lines.append((x, top, x, bottom))
+        streams.append(page_stream(texts, lines))
+    return streams, data_rows
+
+def generate_corpus(corpus_dir, files=10, pages=5, rows=40, columns=5, noise=0.05, seed=1, tree_dirs=20, tree_files=50):
+    rng = random.Random(seed)
+    kinds = column_kinds(columns)
+    manifest = {
+        'generator': GENERATOR,
+        'params': {'files': files, 'pages': pages, 'rows': rows, 'columns': columns, 'noise': noise, 'seed': seed,
+                   'tree_dirs': tree_dirs, 'tree_files': tree_files},
+        'column_names': column_names(kinds),
+        # The unruled text comes out one row per line, but pages are joined with a space, so the pattern is
+        # not anchored at the line end. The ruled tables are filtered on the number column.
+        'invisible_pattern': "^" + " ".join(COLUMN_PATTERNS[kind] for kind in kinds),
+        'grid_pattern': r"^\d{6}$",
+        'grid_filter_index': 0,
+        'rows': {},
+    }
+
+    for layout in ("ruled", "unruled"):
+        folder = os.path.join(corpus_dir, layout)
+        os.makedirs(folder, exist_ok=True)
+        total = 0
+        for number in range(files):
+            streams, data_rows = schedule_pages(rng, pages, rows, kinds, noise, layout == "ruled", total + 1)
+            write_pdf(os.path.join(folder, f"schedule_{number + 1:04d}.pdf"), streams)
+            total += data_rows
+        manifest['rows'][layout] = total
+
+    # A nested folder tree of small files for the Flatten Folder and File Organizer scenarios
+    tree = os.path.join(corpus_dir, "tree")
+    for number in range(tree_dirs):
+        folder = os.path.join(tree, f"group_{number % 5}", f"batch_{number:03d}")
+        os.makedirs(folder, exist_ok=True)
+        for idx in range(tree_files):
+            ext = rng.choice(("pdf", "txt", "csv", "dat", "log"))
+            with open(os.path.join(folder, f"file_{number:03d}_{idx:04d}.{ext}"), 'wb') as file:
+                file.write(rng.randbytes(rng.choice((512, 4096, 65536))))
+
+    with open(os.path.join(corpus_dir, "manifest.json"), 'w') as file:
+        json.dump(manifest, file, indent=2)
+    return manifest
+
+def load_or_generate(corpus_dir, **params):
+    # A corpus is regenerated only when it is missing or was made with different parameters. A folder
+    # this script did not write is never deleted.
+    manifest = None
+    try:
+        with open(os.path.join(corpus_dir, "manifest.json"), 'r') as file:
+            manifest = json.load(file)
+    except (OSError, ValueError):
+        pass
+    if isinstance(manifest, dict) and manifest.get('generator') == GENERATOR:
+        if manifest.get('params') == params:
+            return manifest
+        shutil.rmtree(corpus_dir)
+    elif os.path.isdir(corpus_dir) and os.listdir(corpus_dir):
+        sys.exit(f"{corpus_dir} is not empty and was not generated by {GENERATOR}; choose another --corpus folder")
+    return generate_corpus(corpus_dir, **params)
+
+def add_corpus_arguments(parser):
+    parser.add_argument("--files", type=int, default=10, help="PDFs per layout")
+    parser.add_argument("--pages", type=int, default=5, help="Pages per PDF")
+    parser.add_argument("--rows", type=int, default=40, help="Table rows per page")
+    parser.add_argument("--columns", type=int, default=5, help="Table columns")
+    parser.add_argument("--noise", type=float, default=0.05, help="Share of rows that are non-matching noise")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--tree-dirs", type=int, default=20, help="Folders in the file tree")
+    parser.add_argument("--tree-files", type=int, default=50, help="Files per folder in the file tree")
+
+def corpus_params(args):
+    return {'files': args.files, 'pages': args.pages, 'rows': args.rows, 'columns': args.columns, 'noise': args.noise,
+            'seed': args.seed, 'tree_dirs': args.tree_dirs, 'tree_files': args.tree_files}
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic corpus of ruled and unruled schedule PDFs.")
+    parser.add_argument("corpus_dir")
+    add_corpus_arguments(parser)
+    args = parser.parse_args()
+
+    manifest = generate_corpus(args.corpus_dir, **corpus_params(args))
+    print(f"Wrote {args.files} ruled and {args.files} unruled PDFs ({manifest['rows']['ruled']} and "
+          f"{manifest['rows']['unruled']} data rows) and a {args.tree_dirs * args.tree_files} file tree to {args.corpus_dir}")
+
+if __name__ == "__main__":
+    main()